@@ -2,17 +2,21 @@
 PDF Summarization Tool - Streamlit Web App
 """
 import streamlit as st
-from datetime import datetime
+from datetime import datetime, timezone
 import os
+from types import MappingProxyType
 from typing import Dict, List
-import time
+import hashlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 # Load environment variables
 # load_dotenv() - Removed, using st.secrets instead
 
-from pdf_processor import PDFProcessor
+from pdf_processor import PDFProcessor, extract_to_cache
 from summarizer import Summarizer
-from database import SummaryDatabase
+from database import SummaryDatabase, SummaryWriter
 from report_generator import ReportGenerator
+from rate_limiter import TokenBucket
 # Force reload
 
 
@@ -24,6 +28,29 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Refresh progress widgets every N completed items; each update is a websocket round-trip
+UI_UPDATE_EVERY = 5
+
+# A lone file being summarized from a button can use every core for its pages
+SINGLE_FILE_PROCESSES = os.cpu_count() or 1
+
+# Documents longer than this are summarized section by section (map-reduce)
+LONG_TEXT_THRESHOLD = 60000
+
+# Icon shown in listings for each record status
+_STATUS_ICON = {'success': "✅", 'failed': "❌", 'skipped': "⏭️"}
+
+# Read-only template shared by every summary record built with _row()
+_BASE_ROW = MappingProxyType({
+    'url': '',
+    'filename': '',
+    'long_summary': '',
+    'short_summary': '',
+    'status': 'pending',
+    'error_message': '',
+    'created_at': ''
+})
+
 # Initialize session state
 if 'processing' not in st.session_state:
     st.session_state.processing = False
@@ -39,6 +66,148 @@ if 'processing_phase' not in st.session_state:
     st.session_state.processing_phase = None  # 'download' or 'summarize'
 
 
+@st.cache_resource(show_spinner=False)
+def _get_components(ai_provider: str, api_key_hash: str, supabase_url: str, supabase_key_hash: str,
+                    _api_key: str, _supabase_key: str):
+    """
+    Build components once per set of credentials and reuse them across reruns
+
+    The underscore arguments are left out of Streamlit's cache key; the
+    secret hashes stand in for them so the raw keys are never hashed.
+
+    Returns:
+        Tuple of (pdf_processor, summarizer, database, report_generator)
+    """
+    pdf_processor = PDFProcessor(download_folder="files")
+    summarizer = Summarizer(provider=ai_provider, api_key=_api_key,
+                            enable_prompt_cache=(ai_provider == 'claude'))
+    database = SummaryDatabase(supabase_url=supabase_url, supabase_key=_supabase_key)
+    report_generator = ReportGenerator()
+    return pdf_processor, summarizer, database, report_generator
+
+
+@st.cache_resource(show_spinner=False)
+def _get_rate_limiter(ai_provider: str, api_key_hash: str, rate_per_min: int) -> TokenBucket:
+    """
+    One token bucket per provider key, shared by every session and batch using it
+
+    The summarizer for a key is shared the same way, so separate buckets
+    would each allow the full rate.
+
+    Args:
+        ai_provider: Provider name
+        api_key_hash: Fingerprint of the API key, see _secret_hash
+        rate_per_min: Sustained request ceiling of the provider
+
+    Returns:
+        Shared TokenBucket
+    """
+    return TokenBucket(rate_per_min)
+
+
+@st.cache_data(show_spinner=False)
+def _download_report_bytes(results_digest: str, _results: List[Dict]) -> bytes:
+    """
+    Build the Tab 1 download report, reusing it while the results are unchanged
+
+    Args:
+        results_digest: Fingerprint of the results, used as the cache key
+        _results: Download results (excluded from Streamlit's hashing)
+
+    Returns:
+        Contents of the .xlsx file
+    """
+    return ReportGenerator().create_download_report_bytes(_results)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_list_files(folder: str, mtime_token: int, _pdf_processor) -> List[str]:
+    """
+    List the PDFs of a download folder, reusing the result across reruns
+
+    Args:
+        folder: Download folder being listed
+        mtime_token: Folder modification time, so the cache refreshes when files change
+        _pdf_processor: PDF processor (excluded from Streamlit's hashing)
+
+    Returns:
+        Sorted list of PDF filenames
+    """
+    return _pdf_processor.list_all_files()
+
+
+def list_pdf_files(pdf_processor) -> List[str]:
+    """
+    List the downloaded PDFs through the rerun cache
+
+    Args:
+        pdf_processor: PDFProcessor instance
+
+    Returns:
+        Sorted list of PDF filenames
+    """
+    try:
+        mtime_token = os.stat(pdf_processor.download_folder).st_mtime_ns
+    except OSError:
+        return []
+    return _cached_list_files(pdf_processor.download_folder, mtime_token, pdf_processor)
+
+
+def _row(**fields) -> Dict:
+    """
+    Build a summary record for the database from the shared template
+
+    Batches pass one shared created_at; otherwise the current time is used.
+
+    Args:
+        **fields: Values overriding the template defaults
+
+    Returns:
+        Summary record dictionary
+    """
+    row = dict(_BASE_ROW)
+    row.update(fields)
+    if not row['created_at']:
+        row['created_at'] = datetime.now(timezone.utc).isoformat()
+    return row
+
+
+def _failed_row(error_msg: str, **fields) -> Dict:
+    """
+    Build a summary record for a failed attempt
+
+    Args:
+        error_msg: Error stored in place of both summaries
+        **fields: Further values such as url and filename
+
+    Returns:
+        Summary record dictionary
+    """
+    return _row(long_summary=f"FAILED: {error_msg}", short_summary=f"FAILED: {error_msg}",
+                status='failed', error_message=error_msg, **fields)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_summaries_map(supabase_url: str, filenames: tuple, _database) -> Dict[str, Dict]:
+    """
+    Latest summary per file, reused across reruns until a summary is written
+
+    Args:
+        supabase_url: Database the summaries come from, part of the cache key
+        filenames: Filenames to look up
+        _database: SummaryDatabase instance (excluded from Streamlit's hashing)
+
+    Returns:
+        Dictionary mapping filename to its latest summary record
+    """
+    return _database.get_summaries_by_filenames(list(filenames))
+
+
+def _secret_hash(secret: str) -> str:
+    """Short fingerprint of a secret for use in cache keys"""
+    return hashlib.sha256(secret.encode()).hexdigest()[:16]
+
+
 def initialize_components(ai_provider: str, api_key: str, supabase_url: str, supabase_key: str):
     """
     Initialize all components
@@ -47,16 +216,59 @@ def initialize_components(ai_provider: str, api_key: str, supabase_url: str, sup
         Tuple of (pdf_processor, summarizer, database, report_generator)
     """
     try:
-        pdf_processor = PDFProcessor(download_folder="files")
-        summarizer = Summarizer(provider=ai_provider, api_key=api_key)
-        database = SummaryDatabase(supabase_url=supabase_url, supabase_key=supabase_key)
-        report_generator = ReportGenerator()
+        pdf_processor, summarizer, database, report_generator = _get_components(
+            ai_provider, _secret_hash(api_key), supabase_url, _secret_hash(supabase_key),
+            api_key, supabase_key
+        )
         return pdf_processor, summarizer, database, report_generator, None
     except Exception as e:
         return None, None, None, None, str(e)
 
 
-def download_pdf_file(url: str, pdf_processor, skip_existing: bool = True) -> Dict:
+def create_summaries_cached(summarizer, database, text: str, long_prompt: str, short_prompt: str,
+                            rate_limiter=None, bypass_cache: bool = False):
+    """
+    Create summaries, reusing stored results for identical text, prompts and model
+
+    Args:
+        summarizer: Summarizer instance
+        database: SummaryDatabase instance holding the summary cache
+        text: Extracted document text
+        long_prompt: Long summary prompt
+        short_prompt: Short summary prompt
+        rate_limiter: Optional TokenBucket, drawn from once per provider request
+        bypass_cache: Skip the lookup and always call the provider; the fresh
+            result still replaces the cached one
+
+    Returns:
+        Tuple of (success: bool, long_summary: str, short_summary: str, error_message: str)
+    """
+    cache_key = hashlib.sha256(
+        (text + "|" + long_prompt + "|" + short_prompt + "|" + summarizer.model).encode()
+    ).hexdigest()
+
+    cached = None if bypass_cache else database.get_cached_summary(cache_key)
+    if cached and cached.get('long_summary'):
+        return True, cached['long_summary'], cached.get('short_summary', ''), ""
+
+    # The summarizer draws a token from the limiter for every provider request
+    if len(text) > LONG_TEXT_THRESHOLD:
+        success, long_summary, short_summary, error = summarizer.summarize_long(
+            text, long_prompt, short_prompt, rate_limiter=rate_limiter
+        )
+    else:
+        success, long_summary, short_summary, error = summarizer.create_summaries(
+            text, long_prompt, short_prompt, rate_limiter
+        )
+
+    if success:
+        database.cache_summary(cache_key, long_summary, short_summary)
+
+    return success, long_summary, short_summary, error
+
+
+def download_pdf_file(url: str, pdf_processor, skip_existing: bool = True, existing_set: set = None,
+                      already_summarized: set = None) -> Dict:
     """
     Download a single PDF file
 
@@ -64,6 +276,9 @@ def download_pdf_file(url: str, pdf_processor, skip_existing: bool = True) -> Di
         url: PDF URL
         pdf_processor: PDFProcessor instance
         skip_existing: Skip if file already exists
+        existing_set: Optional pre-listed filenames of the download folder
+        already_summarized: Optional filenames with a successful summary; their
+            text is not re-extracted when skipped
 
     Returns:
         Dictionary with download results
@@ -71,7 +286,7 @@ def download_pdf_file(url: str, pdf_processor, skip_existing: bool = True) -> Di
     result = {
         'url': url,
         'filename': '',
-        'extracted_text': '',
+        'text_path': '',
         'download_status': 'pending',
         'download_error': '',
         'summary_status': 'pending',
@@ -83,16 +298,22 @@ def download_pdf_file(url: str, pdf_processor, skip_existing: bool = True) -> Di
     try:
         # Check if file already exists
         expected_filename = pdf_processor.get_expected_filename(url)
-        file_exists = pdf_processor.file_exists(expected_filename)
+        if existing_set is not None:
+            file_exists = expected_filename in existing_set
+        else:
+            file_exists = pdf_processor.file_exists(expected_filename)
 
         if file_exists and skip_existing:
             result['filename'] = expected_filename
             result['download_status'] = 'skipped'
+            if already_summarized and expected_filename in already_summarized:
+                # Nothing left to summarize, so skip the PDF parse as well
+                return result
             # Extract text for later summarization
             filepath = os.path.join(pdf_processor.download_folder, expected_filename)
-            success, extracted_text, error = pdf_processor.extract_text_and_tables(filepath)
+            success, extracted_text, error = pdf_processor.extract_text_cached(filepath)
             if success:
-                result['extracted_text'] = extracted_text
+                result['text_path'] = pdf_processor.text_cache_path(filepath)
             else:
                 result['download_status'] = 'failed'
                 result['download_error'] = f"Text extraction failed: {error}"
@@ -101,7 +322,7 @@ def download_pdf_file(url: str, pdf_processor, skip_existing: bool = True) -> Di
         # Download and extract PDF
         if file_exists:
             filepath = os.path.join(pdf_processor.download_folder, expected_filename)
-            success, extracted_text, error = pdf_processor.extract_text_and_tables(filepath)
+            success, extracted_text, error = pdf_processor.extract_text_cached(filepath)
             filename = expected_filename
         else:
             success, filename, extracted_text, error = pdf_processor.process_pdf(url)
@@ -112,7 +333,8 @@ def download_pdf_file(url: str, pdf_processor, skip_existing: bool = True) -> Di
             return result
 
         result['filename'] = filename
-        result['extracted_text'] = extracted_text
+        # Keep only the path to the cached text so the text stays out of session state
+        result['text_path'] = pdf_processor.text_cache_path(os.path.join(pdf_processor.download_folder, filename))
         result['download_status'] = 'success'
 
         return result
@@ -123,7 +345,8 @@ def download_pdf_file(url: str, pdf_processor, skip_existing: bool = True) -> Di
         return result
 
 
-def summarize_pdf(result: Dict, summarizer, database, long_prompt: str, short_prompt: str) -> Dict:
+def summarize_pdf(result: Dict, summarizer, database, long_prompt: str, short_prompt: str,
+                  rate_limiter=None, db_writer=None, batch_ts: str = '') -> Dict:
     """
     Summarize a PDF that has been downloaded
 
@@ -133,39 +356,41 @@ def summarize_pdf(result: Dict, summarizer, database, long_prompt: str, short_pr
         database: SummaryDatabase instance
         long_prompt: Long summary prompt
         short_prompt: Short summary prompt
+        rate_limiter: Optional TokenBucket shared by all workers
+        db_writer: Optional SummaryWriter to queue the database insert on
+        batch_ts: Optional created_at shared by the whole batch
 
     Returns:
         Updated dictionary with summarization results
     """
+    save_summary = db_writer.queue_insert if db_writer else database.upsert_summary
+
     try:
         if result['download_status'] != 'success' and result['download_status'] != 'skipped':
             result['summary_status'] = 'skipped'
             result['summary_error'] = 'Download failed or pending'
             return result
 
-        if not result['extracted_text']:
+        if not result.get('text_path') or not os.path.exists(result['text_path']):
             result['summary_status'] = 'failed'
             result['summary_error'] = 'No extracted text available'
             return result
 
-        # Generate summaries
-        success, long_summary, short_summary, error = summarizer.create_summaries(
-            result['extracted_text'], long_prompt, short_prompt
+        extracted_text = PDFProcessor.read_cached_text(result['text_path'])
+
+        # Generate summaries; prompt-cache usage is counted per thread, so other
+        # sessions sharing the summarizer don't leak into this file's tally
+        cached_before = summarizer.thread_cache_read_tokens
+        success, long_summary, short_summary, error = create_summaries_cached(
+            summarizer, database, extracted_text, long_prompt, short_prompt, rate_limiter
         )
+        result['cache_read_tokens'] = summarizer.thread_cache_read_tokens - cached_before
 
         if not success:
             result['summary_status'] = 'failed'
             result['summary_error'] = error
             # Save failed attempt to database
-            database.insert_summary({
-                'url': result['url'],
-                'filename': result['filename'],
-                'long_summary': f"FAILED: {error}",
-                'short_summary': f"FAILED: {error}",
-                'status': 'failed',
-                'error_message': error,
-                'created_at': datetime.utcnow().isoformat()
-            })
+            save_summary(_failed_row(error, url=result['url'], filename=result['filename'], created_at=batch_ts))
             return result
 
         # Update result with summaries
@@ -174,15 +399,10 @@ def summarize_pdf(result: Dict, summarizer, database, long_prompt: str, short_pr
         result['summary_status'] = 'success'
 
         # Save to database
-        database.insert_summary({
-            'url': result['url'],
-            'filename': result['filename'],
-            'long_summary': long_summary,
-            'short_summary': short_summary,
-            'status': 'success',
-            'error_message': '',
-            'created_at': datetime.utcnow().isoformat()
-        })
+        save_summary(_row(
+            url=result['url'], filename=result['filename'],
+            long_summary=long_summary, short_summary=short_summary, status='success', created_at=batch_ts
+        ))
 
         return result
 
@@ -192,6 +412,77 @@ def summarize_pdf(result: Dict, summarizer, database, long_prompt: str, short_pr
         return result
 
 
+def summarize_existing_file(filename: str, existing_url: str, pdf_processor, summarizer, database,
+                            long_prompt: str, short_prompt: str, rate_limiter=None, batch_ts: str = '',
+                            extract_processes: int = 1, db_writer=None, bypass_cache: bool = False) -> Dict:
+    """
+    Extract and summarize a PDF that is already in the download folder
+
+    Runs inside worker threads, so it must not touch Streamlit elements.
+
+    Args:
+        filename: Name of the file in the download folder
+        existing_url: Source URL recorded for the file, if any
+        pdf_processor: PDFProcessor instance
+        summarizer: Summarizer instance
+        database: SummaryDatabase instance holding the summary cache
+        long_prompt: Long summary prompt
+        short_prompt: Short summary prompt
+        rate_limiter: Optional TokenBucket shared by all workers
+        batch_ts: Optional created_at shared by the whole batch
+        extract_processes: Processes to split the PDF's pages across; only worth
+            raising when a single file is being processed
+        db_writer: Optional SummaryWriter the record is queued on before returning,
+            so it is saved even if the caller stops waiting
+        bypass_cache: Re-summarize even if identical text was summarized before
+
+    Returns:
+        Summary record ready to be saved to the database
+    """
+    # Prompt-cache usage is counted per thread, so other sessions sharing the
+    # summarizer don't leak into this file's tally
+    cached_before = summarizer.thread_cache_read_tokens
+    result = _summarize_existing_file(filename, existing_url, pdf_processor, summarizer, database,
+                                      long_prompt, short_prompt, rate_limiter, batch_ts, extract_processes,
+                                      bypass_cache)
+    result['cache_read_tokens'] = summarizer.thread_cache_read_tokens - cached_before
+    if db_writer:
+        db_writer.queue_insert(result)
+    return result
+
+
+def _summarize_existing_file(filename: str, existing_url: str, pdf_processor, summarizer, database,
+                             long_prompt: str, short_prompt: str, rate_limiter, batch_ts: str,
+                             extract_processes: int, bypass_cache: bool) -> Dict:
+    """Body of summarize_existing_file, returning the record without saving it"""
+    try:
+        # Extract text
+        filepath = os.path.join(pdf_processor.download_folder, filename)
+        success, extracted_text, error = pdf_processor.extract_text_cached(filepath, extract_processes)
+
+        if not success:
+            error_msg = f"Text extraction failed: {error}"
+            return _failed_row(error_msg, url=existing_url, filename=filename, created_at=batch_ts)
+
+        # Generate summaries
+        success, long_summary, short_summary, error = create_summaries_cached(
+            summarizer, database, extracted_text, long_prompt, short_prompt, rate_limiter, bypass_cache
+        )
+
+        if success:
+            return _row(
+                url=existing_url, filename=filename,
+                long_summary=long_summary, short_summary=short_summary, status='success', created_at=batch_ts
+            )
+
+        error_msg = f"Summarization failed: {error}"
+        return _failed_row(error_msg, url=existing_url, filename=filename, created_at=batch_ts)
+
+    except Exception as e:
+        error_msg = f"Error processing {filename}: {str(e)}"
+        return _failed_row(error_msg, url=existing_url, filename=filename, created_at=batch_ts)
+
+
 def process_single_pdf(url: str, pdf_processor, summarizer, database, long_prompt: str, short_prompt: str,
                        status_placeholder, progress_text, skip_existing: bool = True) -> Dict:
     """
@@ -211,15 +502,7 @@ def process_single_pdf(url: str, pdf_processor, summarizer, database, long_promp
     Returns:
         Dictionary with processing results
     """
-    result = {
-        'url': url,
-        'filename': '',
-        'long_summary': '',
-        'short_summary': '',
-        'status': 'failed',
-        'error_message': '',
-        'created_at': datetime.utcnow().isoformat()
-    }
+    result = _row(url=url, status='failed')
 
     try:
         # Check if file already exists
@@ -236,13 +519,13 @@ def process_single_pdf(url: str, pdf_processor, summarizer, database, long_promp
         if file_exists:
             status_placeholder.info(f"📄 Using existing file: {expected_filename}")
             filepath = os.path.join(pdf_processor.download_folder, expected_filename)
-            success, extracted_text, error = pdf_processor.extract_text_and_tables(filepath)
+            success, extracted_text, error = pdf_processor.extract_text_cached(filepath)
             if not success:
                 result['error_message'] = error
                 result['long_summary'] = f"FAILED: {error}"
                 result['short_summary'] = f"FAILED: {error}"
                 status_placeholder.error(f"❌ Extraction failed: {error}")
-                database.insert_summary(result)
+                database.upsert_summary(result)
                 return result
             filename = expected_filename
             result['filename'] = filename
@@ -256,7 +539,7 @@ def process_single_pdf(url: str, pdf_processor, summarizer, database, long_promp
                 result['long_summary'] = f"FAILED: {error}"
                 result['short_summary'] = f"FAILED: {error}"
                 status_placeholder.error(f"❌ Download failed: {error}")
-                database.insert_summary(result)
+                database.upsert_summary(result)
                 return result
 
             result['filename'] = filename
@@ -275,7 +558,7 @@ def process_single_pdf(url: str, pdf_processor, summarizer, database, long_promp
             result['long_summary'] = f"FAILED: {error}"
             result['short_summary'] = f"FAILED: {error}"
             status_placeholder.error(f"❌ Summarization failed: {error}")
-            database.insert_summary(result)
+            database.upsert_summary(result)
             return result
 
         # Update result with summaries
@@ -284,7 +567,7 @@ def process_single_pdf(url: str, pdf_processor, summarizer, database, long_promp
         result['status'] = 'success'
 
         # Save to database
-        database.insert_summary(result)
+        database.upsert_summary(result)
 
         status_placeholder.success(f"✅ Completed: {filename}")
 
@@ -295,7 +578,7 @@ def process_single_pdf(url: str, pdf_processor, summarizer, database, long_promp
         result['long_summary'] = f"FAILED: {str(e)}"
         result['short_summary'] = f"FAILED: {str(e)}"
         status_placeholder.error(f"❌ Error: {str(e)}")
-        database.insert_summary(result)
+        database.upsert_summary(result)
         return result
 
 
@@ -357,12 +640,20 @@ def main():
                 help="You can paste up to 500 URLs, one per line"
             )
 
-            # Parse URLs
-            urls = [url.strip() for url in urls_input.split('\n') if url.strip()]
+            # Parse URLs, dropping repeats while keeping their order
+            urls = list(dict.fromkeys(url.strip() for url in urls_input.split('\n') if url.strip()))
             st.info(f"📊 Total URLs: {len(urls)}")
 
         with col2:
-            st.info("ℹ️ Note: This tab only downloads files. Go to 'Existing Files' tab to generate summaries.")
+            st.info("ℹ️ Note: This tab downloads files. Tick 'Summarize while downloading' to summarize new files as they arrive, or use the 'Existing Files' tab to generate summaries later.")
+            summarize_downloads = st.checkbox(
+                "🤖 Summarize while downloading",
+                help="Summarize each newly downloaded PDF as soon as it arrives instead of waiting for the 'Existing Files' tab"
+            )
+
+        # Load prompts from secrets.toml
+        long_prompt = st.secrets.get("LONG_SUMMARY_PROMPT", "")
+        short_prompt = st.secrets.get("SHORT_SUMMARY_PROMPT", "")
 
         # Control buttons
         st.divider()
@@ -403,6 +694,8 @@ def main():
                 errors.append("❌ Supabase API key is required")
             if not urls:
                 errors.append("❌ At least one PDF URL is required")
+            if summarize_downloads and (not long_prompt or not short_prompt):
+                errors.append("❌ Long and short summary prompts are required to summarize while downloading")
 
             if errors:
                 for error in errors:
@@ -420,8 +713,11 @@ def main():
                     st.session_state.processing = True
                     st.session_state.stop_processing = False
                     st.session_state.file_results = []
-                    st.session_state.session_start = datetime.utcnow()
+                    st.session_state.session_start = datetime.now(timezone.utc)
+                    # One timestamp for every row written by this batch
+                    batch_ts = st.session_state.session_start.isoformat()
                     st.session_state.processing_phase = 'download'
+                    st.session_state.summarized_downloads = summarize_downloads
 
                     # Processing UI
                     st.subheader("🔄 Processing Status")
@@ -431,31 +727,114 @@ def main():
                     download_progress = st.progress(0)
                     download_status = st.empty()
 
-                    for idx, url in enumerate(urls):
-                        if st.session_state.stop_processing:
-                            st.warning("⏸️ Processing stopped by user")
-                            break
+                    # Downloads are network-bound, so overlap them across a thread pool.
+                    # When summarizing as we go, each finished download is handed straight
+                    # to a second pool so summarization overlaps the remaining downloads.
+                    download_threads = int(st.secrets.get("DOWNLOAD_THREADS", 16))
+                    summary_threads = int(st.secrets.get("SUMMARY_CONCURRENCY", 6))
+                    rate_limiter = _get_rate_limiter(
+                        ai_provider.lower(), _secret_hash(api_key), int(st.secrets.get("PROVIDER_RPM", 50))
+                    )
+                    summary_futures = []
+                    download_counts = Counter()
+                    db_writer = SummaryWriter(database)
+
+                    # One directory listing and one summary query replace per-URL checks
+                    existing = set(list_pdf_files(pdf_processor))
+                    existing_names = [
+                        name for name in dict.fromkeys(pdf_processor.get_expected_filename(url) for url in urls)
+                        if name in existing
+                    ]
+                    summaries_map = database.get_summaries_by_filenames(
+                        existing_names, fields="filename,status,long_summary"
+                    )
+                    already_summarized = {
+                        name for name, summary in summaries_map.items()
+                        if summary.get('status') == 'success' and summary.get('long_summary')
+                    }
+
+                    # Explicit pools instead of with-blocks: leaving a with-block waits for
+                    # every queued download and summary, so Stop or a rerun would block
+                    pool = ThreadPoolExecutor(max_workers=download_threads)
+                    summary_pool = ThreadPoolExecutor(max_workers=summary_threads)
+                    try:
+                        futures = {
+                            pool.submit(download_pdf_file, url, pdf_processor, True,
+                                        existing, already_summarized): url
+                            for url in urls
+                        }
+
+                        for idx, future in enumerate(as_completed(futures)):
+                            if st.session_state.stop_processing:
+                                for pending in list(futures) + summary_futures:
+                                    pending.cancel()
+                                st.warning("⏸️ Processing stopped by user")
+                                break
+
+                            url = futures[future]
+                            result = future.result()
+                            st.session_state.file_results.append(result)
+                            download_counts[result['download_status']] += 1
+
+                            # Save URL to database for later retrieval, without
+                            # demoting files that already have a summary back to pending
+                            if result['download_status'] in ['success', 'skipped'] and result.get('filename') \
+                                    and result['filename'] not in already_summarized:
+                                db_writer.queue_insert(_row(url=url, filename=result['filename'], created_at=batch_ts))
+
+                            # Newly downloaded files go straight into summarization;
+                            # skipped files keep whatever summary they already have
+                            if summarize_downloads and result['download_status'] == 'success':
+                                summary_futures.append(summary_pool.submit(
+                                    summarize_pdf, result, summarizer, database,
+                                    long_prompt, short_prompt, rate_limiter, db_writer, batch_ts
+                                ))
+
+                            # Update progress
+                            if idx % UI_UPDATE_EVERY == 0 or idx == len(urls) - 1:
+                                download_status.info(f"📥 Downloaded {idx + 1}/{len(urls)}: {url[:60]}...")
+                                download_progress.progress((idx + 1) / len(urls))
+
+                        download_status.success(f"✅ Download phase complete! {len(st.session_state.file_results)} files processed")
+
+                        if summary_futures:
+                            # Phase 2: wait for the summaries still in flight
+                            st.markdown("### Phase 2: Summarizing PDFs")
+                            summary_progress = st.progress(0)
+                            summary_status = st.empty()
+                            summarized_count = 0
+                            cached_tokens = 0
+
+                            for i, future in enumerate(as_completed(summary_futures)):
+                                if st.session_state.stop_processing:
+                                    for pending in summary_futures:
+                                        pending.cancel()
+                                    st.warning("⏸️ Processing stopped by user")
+                                    break
+
+                                result = future.result()
+                                cached_tokens += result.get('cache_read_tokens', 0)
+                                if result['summary_status'] == 'success':
+                                    summarized_count += 1
+                                if i % UI_UPDATE_EVERY == 0 or i == len(summary_futures) - 1:
+                                    summary_status.info(f"🤖 Summarized {i + 1}/{len(summary_futures)}: {result['filename']}")
+                                    summary_progress.progress((i + 1) / len(summary_futures))
+
+                            summary_status.success(f"✅ Summarization complete! {summarized_count}/{len(summary_futures)} files summarized")
+                            if cached_tokens:
+                                st.caption(f"⚡ {cached_tokens:,} prompt tokens served from the provider's prompt cache")
+                    finally:
+                        # Drop queued work instead of waiting for it; running summaries
+                        # still queue their own rows on the writer
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        summary_pool.shutdown(wait=False, cancel_futures=True)
+                        # Also runs when Stop interrupts the script, so queued rows aren't lost
+                        db_writer.flush()
+                        pdf_processor.prune_text_cache()
+                        # Tab 2 should see the new files and rows on its next render
+                        _cached_list_files.clear()
+                        _cached_summaries_map.clear()
 
-                        download_status.info(f"📥 Downloading {idx + 1}/{len(urls)}: {url[:60]}...")
-                        result = download_pdf_file(url, pdf_processor, skip_existing=True)
-                        st.session_state.file_results.append(result)
-                        
-                        # Save URL to database for later retrieval
-                        if result['download_status'] in ['success', 'skipped'] and result.get('filename'):
-                            database.insert_summary({
-                                'url': url,
-                                'filename': result['filename'],
-                                'long_summary': '',
-                                'short_summary': '',
-                                'status': 'pending',
-                                'error_message': '',
-                                'created_at': datetime.utcnow().isoformat()
-                            })
-
-                        # Update progress
-                        download_progress.progress((idx + 1) / len(urls))
-
-                    download_status.success(f"✅ Download phase complete! {len(st.session_state.file_results)} files processed")
                     st.session_state.processing = False
                     st.session_state.processing_phase = None
 
@@ -463,13 +842,9 @@ def main():
                     st.divider()
                     # Removed intermediate status table as requested
 
-                    # Show statistics
-                    successful_downloads = sum(1 for r in st.session_state.file_results if r['download_status'] == 'success')
-                    skipped_downloads = sum(1 for r in st.session_state.file_results if r['download_status'] == 'skipped')
-                    failed_downloads = sum(1 for r in st.session_state.file_results if r['download_status'] == 'failed')
-
+                    # Show statistics, tallied as each download completed
                     st.success(f"""
-                    **Download Summary**: {successful_downloads} downloaded, {skipped_downloads} skipped (already exists), {failed_downloads} failed
+                    **Download Summary**: {download_counts['success']} downloaded, {download_counts['skipped']} skipped (already exists), {download_counts['failed']} failed
                     """)
 
         if stop_button:
@@ -479,6 +854,7 @@ def main():
         if clear_button:
             st.session_state.file_results = []
             st.session_state.processed_items = []
+            st.session_state.pop('results_show_summary', None)
             st.rerun()
 
         # Display existing results from file_results
@@ -491,27 +867,26 @@ def main():
             display_status_table(st.session_state.file_results, pdf_processor if 'pdf_processor' in locals() else None,
                                summarizer if 'summarizer' in locals() else None,
                                database if 'database' in locals() else None,
-                               "", "", key_prefix="results", show_summary_status=False)
+                               long_prompt, short_prompt, key_prefix="results",
+                               show_summary_status=st.session_state.get('summarized_downloads', False))
 
             # Download Excel Report
             st.divider()
             if st.button("📥 Summary of Download", type="primary", key="download_report_tab1"):
                 try:
-                    report_gen = ReportGenerator()
-                    excel_file = report_gen.create_download_report(st.session_state.file_results)
-
-                    with open(excel_file, 'rb') as f:
-                        st.download_button(
-                            label="💾 Click to Download",
-                            data=f,
-                            file_name=excel_file,
-                            mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                            key="download_excel_tab1"
-                        )
-
-                    # Clean up file after download
-                    if os.path.exists(excel_file):
-                        os.remove(excel_file)
+                    results_digest = hashlib.sha256("\n".join(
+                        f"{r.get('url')}|{r.get('filename')}|{r.get('download_status')}|{r.get('download_error')}"
+                        for r in st.session_state.file_results
+                    ).encode()).hexdigest()
+                    report_bytes = _download_report_bytes(results_digest, st.session_state.file_results)
+
+                    st.download_button(
+                        label="💾 Click to Download",
+                        data=report_bytes,
+                        file_name=f"download_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                        mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                        key="download_excel_tab1"
+                    )
 
                 except Exception as e:
                     st.error(f"Error generating report: {str(e)}")
@@ -528,7 +903,7 @@ def main():
 
             if not init_error:
                 # List all files
-                existing_files = pdf_processor.list_all_files()
+                existing_files = list_pdf_files(pdf_processor)
 
                 if existing_files:
                     st.info(f"Found {len(existing_files)} PDF files in the files folder")
@@ -561,18 +936,20 @@ def main():
                         if not long_prompt or not short_prompt:
                             st.error("❌ Please set long and short summary prompts above first")
                         else:
-                            progress_bar = st.progress(0)
-                            status_text = st.empty()
-                            
                             success_count = 0
                             fail_count = 0
                             skipped_count = 0
+                            batch_ts = datetime.now(timezone.utc).isoformat()
                             
                             files_to_process = []
+                            existing_urls = {}
+                            summaries_map = database.get_summaries_by_filenames(
+                                existing_files, fields="filename,url,status,long_summary"
+                            )
                             for f in existing_files:
                                 # Check if already summarized
                                 should_process = False
-                                summary = database.get_summary_by_filename(f)
+                                summary = summaries_map.get(f)
                                 
                                 if force_resummarize:
                                     should_process = True
@@ -585,6 +962,8 @@ def main():
                                 
                                 if should_process:
                                     files_to_process.append(f)
+                                    # Remember the source URL so workers don't need to query for it
+                                    existing_urls[f] = summary.get('url', '') if summary else ''
                                 else:
                                     skipped_count += 1
                             
@@ -592,153 +971,141 @@ def main():
                                 st.info("✨ All files are already summarized!")
                             else:
                                 st.info(f"Processing {len(files_to_process)} files ({skipped_count} skipped)...")
-                                
-                                for i, filename in enumerate(files_to_process):
-                                    status_text.text(f"Processing {i+1}/{len(files_to_process)}: {filename}...")
-                                    
-                                    # Try to get existing URL from database
-                                    existing_url = ''
-                                    existing_summary = database.get_summary_by_filename(filename)
-                                    if existing_summary and existing_summary.get('url'):
-                                        existing_url = existing_summary.get('url')
-                                    
-                                    try:
-                                        # Extract text
-                                        filepath = os.path.join(pdf_processor.download_folder, filename)
-                                        success, extracted_text, error = pdf_processor.extract_text_and_tables(filepath)
-                                        
-                                        if not success:
-                                            fail_count += 1
-                                            error_msg = f"Text extraction failed: {error}"
-                                            # Save failure to database
-                                            result = {
-                                                'url': existing_url,
-                                                'filename': filename,
-                                                'long_summary': f"FAILED: {error_msg}",
-                                                'short_summary': f"FAILED: {error_msg}",
-                                                'status': 'failed',
-                                                'error_message': error_msg,
-                                                'created_at': datetime.utcnow().isoformat()
-                                            }
-                                            database.insert_summary(result)
-                                        else:
-                                            # Generate summaries
-                                            success, long_summary, short_summary, error = summarizer.create_summaries(
-                                                extracted_text, long_prompt, short_prompt
-                                            )
-                                            
-                                            if success:
-                                                # Save to database
-                                                result = {
-                                                    'url': existing_url,
-                                                    'filename': filename,
-                                                    'long_summary': long_summary,
-                                                    'short_summary': short_summary,
-                                                    'status': 'success',
-                                                    'error_message': '',
-                                                    'created_at': datetime.utcnow().isoformat()
-                                                }
-                                                database.insert_summary(result)
+
+                                # Summaries are latency-bound, so run several files at once and
+                                # let the shared limiter keep us under the provider's RPM ceiling
+                                concurrency = int(st.secrets.get("SUMMARY_CONCURRENCY", 6))
+                                rate_limiter = _get_rate_limiter(
+                                    ai_provider.lower(), _secret_hash(api_key), int(st.secrets.get("PROVIDER_RPM", 50))
+                                )
+                                # Text extraction is CPU-bound, so it runs in separate processes;
+                                # kept small since many readers thrash slow disks
+                                extract_processes = int(st.secrets.get(
+                                    "EXTRACT_PROCESSES", min(4, max(1, (os.cpu_count() or 2) - 1))
+                                ))
+                                db_writer = SummaryWriter(database)
+                                cached_tokens = 0
+
+                                errors = []
+
+                                # Explicit pools instead of with-blocks, whose exit would wait for
+                                # every queued file when a rerun interrupts the batch
+                                extract_pool = ProcessPoolExecutor(max_workers=extract_processes)
+                                pool = ThreadPoolExecutor(max_workers=concurrency)
+                                try:
+                                    with st.status("Summarizing batch", expanded=True) as status:
+                                        progress_bar = st.progress(0)
+
+                                        # Each file is queued for summarization once its text is in
+                                        # the disk cache, so summaries overlap the remaining extraction
+                                        extract_futures = {
+                                            extract_pool.submit(
+                                                extract_to_cache, pdf_processor.download_folder,
+                                                os.path.join(pdf_processor.download_folder, filename)
+                                            ): filename
+                                            for filename in files_to_process
+                                        }
+                                        futures = {}
+                                        for i, extract_future in enumerate(as_completed(extract_futures)):
+                                            filename = extract_futures[extract_future]
+                                            try:
+                                                _, _, digest = extract_future.result()
+                                            except Exception:
+                                                digest = ''
+                                            if digest:
+                                                # The worker already hashed the file; don't hash it again here
+                                                pdf_processor.remember_hash(
+                                                    os.path.join(pdf_processor.download_folder, filename), digest
+                                                )
+                                            futures[pool.submit(
+                                                summarize_existing_file, filename, existing_urls[filename],
+                                                pdf_processor, summarizer, database,
+                                                long_prompt, short_prompt, rate_limiter, batch_ts,
+                                                db_writer=db_writer, bypass_cache=force_resummarize
+                                            )] = filename
+
+                                            if i % UI_UPDATE_EVERY == 0 or i == len(files_to_process) - 1:
+                                                status.update(label=f"Extracting text: {i + 1}/{len(files_to_process)}")
+
+                                        for i, future in enumerate(as_completed(futures)):
+                                            result = future.result()
+                                            cached_tokens += result.get('cache_read_tokens', 0)
+
+                                            if result['status'] == 'success':
                                                 success_count += 1
                                             else:
                                                 fail_count += 1
-                                                error_msg = f"Summarization failed: {error}"
-                                                # Save failure to database
-                                                result = {
-                                                    'url': existing_url,
-                                                    'filename': filename,
-                                                    'long_summary': f"FAILED: {error_msg}",
-                                                    'short_summary': f"FAILED: {error_msg}",
-                                                    'status': 'failed',
-                                                    'error_message': error_msg,
-                                                    'created_at': datetime.utcnow().isoformat()
-                                                }
-                                                database.insert_summary(result)
-                                            
-                                    except Exception as e:
-                                        fail_count += 1
-                                        error_msg = f"Error processing {filename}: {str(e)}"
-                                        st.error(error_msg)
-                                        # Save failure to database
-                                        result = {
-                                            'url': existing_url,
-                                            'filename': filename,
-                                            'long_summary': f"FAILED: {error_msg}",
-                                            'short_summary': f"FAILED: {error_msg}",
-                                            'status': 'failed',
-                                            'error_message': error_msg,
-                                            'created_at': datetime.utcnow().isoformat()
-                                        }
-                                        database.insert_summary(result)
-                                
-                                    # Update progress
-                                    progress_bar.progress((i + 1) / len(files_to_process))
-                                    
-                                    # Rate limit delay
-                                    time.sleep(2)
-                                
-                                status_text.empty()
+                                                errors.append(f"{result['filename']}: {result['error_message']}")
+
+                                            # Update progress
+                                            if i % UI_UPDATE_EVERY == 0 or i == len(files_to_process) - 1:
+                                                status.update(label=f"Summarizing batch: {i + 1}/{len(files_to_process)}")
+                                                progress_bar.progress((i + 1) / len(files_to_process))
+
+                                        status.update(label="Batch complete", state="complete", expanded=False)
+                                finally:
+                                    # Workers queue their own rows, so files still running are saved
+                                    extract_pool.shutdown(wait=False, cancel_futures=True)
+                                    pool.shutdown(wait=False, cancel_futures=True)
+                                    db_writer.flush()
+                                    pdf_processor.prune_text_cache()
+
+                                if errors:
+                                    with st.expander(f"❌ Errors ({len(errors)})"):
+                                        st.markdown("\n".join(f"- {error}" for error in errors))
+
                                 st.success(f"✅ Batch processing complete! Successful: {success_count}, Failed: {fail_count}, Skipped: {skipped_count}")
-                            time.sleep(1)
-                            st.rerun()
+                                if cached_tokens:
+                                    st.caption(f"⚡ {cached_tokens:,} prompt tokens served from the provider's prompt cache")
+                            # The file listing below renders after this point, so clearing the
+                            # cache is enough to show the new results without a rerun
+                            _cached_summaries_map.clear()
 
                     st.divider()
                     
                     # Download Report Button for Tab 2
                     if st.button("📥 Download Excel Report", type="primary", key="download_report_tab2"):
                         try:
-                            # Fetch all summaries
-                            all_summaries = database.get_all_summaries()
+                            # Fetch the latest summary for each filename, deduplicated server-side
+                            latest_summaries = database.get_latest_unique_summaries()
                             
-                            if all_summaries:
-                                # Deduplicate summaries - keep only the latest for each filename
-                                latest_summaries = {}
-                                for summary in all_summaries:
-                                    filename = summary.get('filename')
-                                    if filename:
-                                        # Since get_all_summaries orders by created_at desc, 
-                                        # the first one we see is the latest
-                                        if filename not in latest_summaries:
-                                            latest_summaries[filename] = summary
-                                
-                                unique_summaries = list(latest_summaries.values())
-                                
+                            if latest_summaries:
                                 report_gen = ReportGenerator()
-                                excel_file = report_gen.create_summary_report(unique_summaries, pdf_processor.download_folder)
-                                
-                                with open(excel_file, 'rb') as f:
-                                    st.download_button(
-                                        label="💾 Click to Download",
-                                        data=f,
-                                        file_name=excel_file,
-                                        mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                                        key="download_excel_btn_tab2"
-                                    )
+                                report_bytes = report_gen.create_summary_report_bytes(latest_summaries, pdf_processor.download_folder)
                                 
-                                # Clean up
-                                if os.path.exists(excel_file):
-                                    os.remove(excel_file)
+                                st.download_button(
+                                    label="💾 Click to Download",
+                                    data=report_bytes,
+                                    file_name=f"summary_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                                    mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                                    key="download_excel_btn_tab2"
+                                )
                             else:
                                 st.warning("No summaries found to export")
                                 
                         except Exception as e:
                             st.error(f"Error generating report: {str(e)}")
 
+                    # Batches only prune entries for files they have hashed; this also
+                    # hashes the rest of the folder, so it is left to an explicit click
+                    if st.button("🧹 Clean Text Cache", key="prune_text_cache",
+                                 help="Remove cached extracted text for PDFs that changed or were deleted"):
+                        with st.spinner("Checking cached text against the PDFs..."):
+                            removed = pdf_processor.prune_text_cache(rehash=True)
+                        st.success(f"✅ Removed {removed} stale cache entries")
+
                     st.divider()
 
+                    # One batched lookup for the whole listing instead of a query per file
+                    listing_summaries = _cached_summaries_map(supabase_url, tuple(existing_files), database)
+
                     # Display each file
                     for idx, filename in enumerate(existing_files, 1):
                         # Check if summary exists in database
-                        summary_record = database.get_summary_by_filename(filename)
+                        summary_record = listing_summaries.get(filename)
                         
-                        # Determine status icon
-                        icon = "⚪"  # Default/Pending
-                        if summary_record:
-                            status = summary_record.get('status')
-                            if status == 'success':
-                                icon = "✅"
-                            elif status == 'failed':
-                                icon = "❌"
+                        # Determine status icon; pending and missing records stay white
+                        icon = _STATUS_ICON.get(summary_record.get('status'), "⚪") if summary_record else "⚪"
                         
                         with st.expander(f"{icon} {idx}. {filename}"):
 
@@ -772,31 +1139,19 @@ def main():
                                 if st.button(f"🔄 Re-summarize", key=f"resummarize_{idx}"):
                                     if long_prompt and short_prompt:
                                         with st.spinner(f"Re-summarizing {filename}..."):
-                                            filepath = os.path.join(pdf_processor.download_folder, filename)
-                                            success, extracted_text, error = pdf_processor.extract_text_and_tables(filepath)
-
-                                            if success:
-                                                success, long_summary, short_summary, error = summarizer.create_summaries(
-                                                    extracted_text, long_prompt, short_prompt
-                                                )
+                                            result = summarize_existing_file(
+                                                filename, summary_record.get('url', ''), pdf_processor,
+                                                summarizer, database, long_prompt, short_prompt,
+                                                extract_processes=SINGLE_FILE_PROCESSES, bypass_cache=True
+                                            )
 
-                                                if success:
-                                                    # Update database
-                                                    result = {
-                                                        'url': summary_record.get('url', ''),
-                                                        'filename': filename,
-                                                        'long_summary': long_summary,
-                                                        'short_summary': short_summary,
-                                                        'status': 'success',
-                                                        'error_message': '',
-                                                        'created_at': datetime.utcnow().isoformat()
-                                                    }
-                                                    database.insert_summary(result)
-                                                    st.success("✅ Re-summarization complete! Refresh the page to see updates.")
-                                                else:
-                                                    st.error(f"❌ Summarization failed: {error}")
+                                            if result['status'] == 'success':
+                                                # Update database; a failed attempt keeps the existing summary
+                                                database.upsert_summary(result)
+                                                _cached_summaries_map.clear()
+                                                st.success("✅ Re-summarization complete! Refresh the page to see updates.")
                                             else:
-                                                st.error(f"❌ Text extraction failed: {error}")
+                                                st.error(f"❌ {result['error_message']}")
                                     else:
                                         st.warning("⚠️ Please set long and short summary prompts first")
                             elif summary_record and summary_record.get('status') == 'failed':
@@ -807,45 +1162,21 @@ def main():
                                 if st.button(f"🔄 Retry", key=f"retry_{idx}"):
                                     if long_prompt and short_prompt:
                                         with st.spinner(f"Retrying {filename}..."):
-                                            filepath = os.path.join(pdf_processor.download_folder, filename)
-                                            success, extracted_text, error = pdf_processor.extract_text_and_tables(filepath)
-                                            
-                                            if success:
-                                                success, long_summary, short_summary, error = summarizer.create_summaries(
-                                                    extracted_text, long_prompt, short_prompt
-                                                )
-                                                
-                                                if success:
-                                                    # Update database
-                                                    result = {
-                                                        'url': summary_record.get('url', ''),
-                                                        'filename': filename,
-                                                        'long_summary': long_summary,
-                                                        'short_summary': short_summary,
-                                                        'status': 'success',
-                                                        'error_message': '',
-                                                        'created_at': datetime.utcnow().isoformat()
-                                                    }
-                                                    database.insert_summary(result)
-                                                    st.success("✅ Retry successful! Refresh the page to see updates.")
-                                                    time.sleep(1)
-                                                    st.rerun()
-                                                else:
-                                                    error_msg = f"Retry failed: {error}"
-                                                    st.error(error_msg)
-                                                    # Update failure in database
-                                                    result = {
-                                                        'url': summary_record.get('url', ''),
-                                                        'filename': filename,
-                                                        'long_summary': f"FAILED: {error_msg}",
-                                                        'short_summary': f"FAILED: {error_msg}",
-                                                        'status': 'failed',
-                                                        'error_message': error_msg,
-                                                        'created_at': datetime.utcnow().isoformat()
-                                                    }
-                                                    database.insert_summary(result)
+                                            result = summarize_existing_file(
+                                                filename, summary_record.get('url', ''), pdf_processor,
+                                                summarizer, database, long_prompt, short_prompt,
+                                                extract_processes=SINGLE_FILE_PROCESSES
+                                            )
+
+                                            # Update database with the outcome either way
+                                            database.upsert_summary(result)
+                                            _cached_summaries_map.clear()
+
+                                            if result['status'] == 'success':
+                                                st.success("✅ Retry successful! Refresh the page to see updates.")
+                                                st.rerun()
                                             else:
-                                                st.error(f"❌ Text extraction failed: {error}")
+                                                st.error(f"❌ Retry failed: {result['error_message']}")
                                     else:
                                         st.warning("⚠️ Please set long and short summary prompts first")
 
@@ -855,66 +1186,26 @@ def main():
                                 # Summarize button for files without summaries
                                 if st.button(f"🤖 Generate Summary", key=f"summarize_{idx}"):
                                     if long_prompt and short_prompt:
-                                        # Try to get existing URL from database
-                                        existing_url = ''
-                                        existing_summary = database.get_summary_by_filename(filename)
-                                        if existing_summary and existing_summary.get('url'):
-                                            existing_url = existing_summary.get('url')
+                                        # Reuse the URL of the record already looked up for this file
+                                        existing_url = summary_record.get('url', '') if summary_record else ''
                                         
                                         with st.spinner(f"Generating summary for {filename}..."):
-                                            filepath = os.path.join(pdf_processor.download_folder, filename)
-                                            success, extracted_text, error = pdf_processor.extract_text_and_tables(filepath)
+                                            result = summarize_existing_file(
+                                                filename, existing_url, pdf_processor,
+                                                summarizer, database, long_prompt, short_prompt,
+                                                extract_processes=SINGLE_FILE_PROCESSES
+                                            )
 
-                                            if success:
-                                                success, long_summary, short_summary, error = summarizer.create_summaries(
-                                                    extracted_text, long_prompt, short_prompt
-                                                )
+                                            # Save to database, failures included
+                                            database.upsert_summary(result)
+                                            _cached_summaries_map.clear()
 
-                                                if success:
-                                                    # Save to database
-                                                    result = {
-                                                        'url': existing_url,
-                                                        'filename': filename,
-                                                        'long_summary': long_summary,
-                                                        'short_summary': short_summary,
-                                                        'status': 'success',
-                                                        'error_message': '',
-                                                        'created_at': datetime.utcnow().isoformat()
-                                                    }
-                                                    database.insert_summary(result)
-                                                    st.success("✅ Summarization complete! Refresh the page to see updates.")
-                                                else:
-                                                    error_msg = f"Summarization failed: {error}"
-                                                    st.error(f"❌ {error_msg}")
-                                                    # Save failure to database
-                                                    result = {
-                                                        'url': existing_url,
-                                                        'filename': filename,
-                                                        'long_summary': f"FAILED: {error_msg}",
-                                                        'short_summary': f"FAILED: {error_msg}",
-                                                        'status': 'failed',
-                                                        'error_message': error_msg,
-                                                        'created_at': datetime.utcnow().isoformat()
-                                                    }
-                                                    database.insert_summary(result)
-                                                    time.sleep(1)
-                                                    st.rerun()
+                                            if result['status'] == 'success':
+                                                st.success("✅ Summarization complete! Refresh the page to see updates.")
                                             else:
-                                                error_msg = f"Text extraction failed: {error}"
-                                                st.error(f"❌ {error_msg}")
-                                                # Save failure to database
-                                                result = {
-                                                    'url': existing_url,
-                                                    'filename': filename,
-                                                    'long_summary': f"FAILED: {error_msg}",
-                                                    'short_summary': f"FAILED: {error_msg}",
-                                                    'status': 'failed',
-                                                    'error_message': error_msg,
-                                                    'created_at': datetime.utcnow().isoformat()
-                                                }
-                                                database.insert_summary(result)
-                                                time.sleep(1)
-                                                st.rerun()
+                                                # No rerun here, it would clear the error before it is seen;
+                                                # the saved failure shows up in the listing on the next run
+                                                st.error(f"❌ {result['error_message']}")
                                     else:
                                         st.warning("⚠️ Please set long and short summary prompts first")
                 else:
@@ -948,6 +1239,9 @@ def display_status_table(results: List[Dict], pdf_processor, summarizer, databas
     if not results:
         return
 
+    # Rows whose summary is expanded, keyed by row index
+    show_summary = st.session_state.setdefault(f'{key_prefix}_show_summary', {})
+
     # Create status table
     for idx, result in enumerate(results):
         with st.container():
@@ -993,7 +1287,7 @@ def display_status_table(results: List[Dict], pdf_processor, summarizer, databas
                 # View summary button
                 if summary_status == 'success':
                     if st.button("👁️ View", key=f"{key_prefix}_view_{idx}"):
-                        st.session_state[f'{key_prefix}_show_summary_{idx}'] = not st.session_state.get(f'{key_prefix}_show_summary_{idx}', False)
+                        show_summary[idx] = not show_summary.get(idx, False)
 
             with col5:
                 # Retry button for failures
@@ -1003,6 +1297,7 @@ def display_status_table(results: List[Dict], pdf_processor, summarizer, databas
                             new_result = download_pdf_file(result['url'], pdf_processor, skip_existing=False)
                             # Update the result in session state
                             st.session_state.file_results[idx] = new_result
+                            _cached_list_files.clear()
                             st.rerun()
 
                 elif summary_status == 'failed':
@@ -1011,10 +1306,11 @@ def display_status_table(results: List[Dict], pdf_processor, summarizer, databas
                             new_result = summarize_pdf(result, summarizer, database, long_prompt, short_prompt)
                             # Update the result in session state
                             st.session_state.file_results[idx] = new_result
+                            _cached_summaries_map.clear()
                             st.rerun()
 
             # Show summary details if expanded
-            if st.session_state.get(f'{key_prefix}_show_summary_{idx}', False) and summary_status == 'success':
+            if show_summary.get(idx, False) and summary_status == 'success':
                 st.markdown("**Long Summary:**")
                 st.text_area(
                     "Long Summary",
@@ -1044,12 +1340,7 @@ def display_result(result: Dict, index: int):
         result: Result dictionary
         index: Item index
     """
-    if result['status'] == 'success':
-        status_icon = "✅"
-    elif result['status'] == 'skipped':
-        status_icon = "⏭️"
-    else:
-        status_icon = "❌"
+    status_icon = _STATUS_ICON.get(result['status'], "❌")
 
     with st.expander(f"{status_icon} {index}. {result['filename'] or 'Unknown'} - {result['status'].upper()}"):
         st.markdown(f"**URL**: {result['url']}")
@@ -2,9 +2,33 @@
 Supabase database integration for storing summary results
 """
 from supabase import create_client, Client
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Dict, List, Optional
 import os
+import queue
+import threading
+import time
+
+
+@lru_cache(maxsize=8)
+def _get_client(supabase_url: str, supabase_key: str) -> Client:
+    """
+    Supabase client shared by every SummaryDatabase with the same credentials
+
+    Keeps one HTTP connection pool per process instead of one per instance.
+    """
+    return create_client(supabase_url, supabase_key)
+
+
+def _utc_now() -> str:
+    """Current UTC time as an ISO 8601 string"""
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _recency(record: Dict) -> tuple:
+    """Sort key for picking a file's latest row: created_at, then id for rows of the same batch"""
+    return record.get("created_at") or "", record.get("id") or 0
 
 
 class SummaryDatabase:
@@ -18,8 +42,9 @@ class SummaryDatabase:
             supabase_url: Supabase project URL
             supabase_key: Supabase API key
         """
-        self.client: Client = create_client(supabase_url, supabase_key)
+        self.client: Client = _get_client(supabase_url, supabase_key)
         self.table_name = "pdf_summaries"
+        self.cache_table_name = "summary_cache"
 
     def create_table_if_not_exists(self):
         """
@@ -39,9 +64,61 @@ class SummaryDatabase:
             created_at TIMESTAMP DEFAULT NOW(),
             updated_at TIMESTAMP DEFAULT NOW()
         );
+        CREATE UNIQUE INDEX IF NOT EXISTS pdf_summaries_filename_key ON pdf_summaries(filename);
+
+        The unique index turns the latest-summary lookups by filename into index
+        seeks. Tables that keep every attempt instead need
+        CREATE INDEX pdf_summaries_filename_created_idx ON pdf_summaries(filename, created_at DESC);
         """
         pass
 
+    @staticmethod
+    def _build_record(data: Dict, now: str) -> Dict:
+        """
+        Shape a summary dictionary into a pdf_summaries row
+
+        Args:
+            data: Dictionary shaped like insert_summary's data; a created_at in it,
+                such as a batch's shared timestamp, is kept
+            now: Timestamp used for updated_at, and for created_at when data has none
+
+        Returns:
+            Row ready to send to Supabase
+        """
+        return {
+            "url": data.get("url"),
+            "filename": data.get("filename"),
+            "long_summary": data.get("long_summary", ""),
+            "short_summary": data.get("short_summary", ""),
+            "status": data.get("status", "pending"),
+            "error_message": data.get("error_message", ""),
+            "created_at": data.get("created_at") or now,
+            "updated_at": now
+        }
+
+    def _without_success_overwrites(self, records: List[Dict]) -> List[Dict]:
+        """
+        Drop failed or pending records for files that already have a successful summary
+
+        An upsert on filename replaces the stored row, so without this a transient
+        failure or a fresh "pending" row would wipe out a good summary.
+
+        Args:
+            records: Records about to be upserted
+
+        Returns:
+            The records that are safe to write
+        """
+        at_risk = [data.get("filename") for data in records
+                   if data.get("status") != "success" and data.get("filename")]
+        if not at_risk:
+            return records
+
+        existing = self.get_summaries_by_filenames(list(dict.fromkeys(at_risk)), fields="filename,status")
+        protected = {name for name, summary in existing.items() if summary.get("status") == "success"}
+        return [data for data in records
+                if data.get("status") == "success" or data.get("filename") not in protected]
+
     def insert_summary(self, data: Dict) -> Optional[Dict]:
         """
         Insert a new summary record
@@ -59,16 +136,7 @@ class SummaryDatabase:
             Inserted record or None if failed
         """
         try:
-            record = {
-                "url": data.get("url"),
-                "filename": data.get("filename"),
-                "long_summary": data.get("long_summary", ""),
-                "short_summary": data.get("short_summary", ""),
-                "status": data.get("status", "pending"),
-                "error_message": data.get("error_message", ""),
-                "created_at": datetime.utcnow().isoformat(),
-                "updated_at": datetime.utcnow().isoformat()
-            }
+            record = self._build_record(data, _utc_now())
 
             response = self.client.table(self.table_name).insert(record).execute()
             return response.data[0] if response.data else None
@@ -76,6 +144,85 @@ class SummaryDatabase:
             print(f"Error inserting summary: {str(e)}")
             return None
 
+    def upsert_summary(self, data: Dict) -> Optional[Dict]:
+        """
+        Insert a summary record, or overwrite the existing record for its filename
+
+        Needs the unique index on pdf_summaries(filename) from setup_supabase.sql;
+        without it the record is inserted as a new row instead. A failed or
+        pending record never replaces a successful summary.
+
+        Args:
+            data: Dictionary shaped like insert_summary's data
+
+        Returns:
+            Saved record or None if failed or skipped
+        """
+        if not self._without_success_overwrites([data]):
+            return None
+
+        try:
+            record = self._build_record(data, _utc_now())
+
+            response = self.client.table(self.table_name).upsert(record, on_conflict="filename").execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            print(f"Error upserting summary, inserting instead: {str(e)}")
+            return self.insert_summary(data)
+
+    def upsert_summaries_bulk(self, records: List[Dict]) -> List[Dict]:
+        """
+        Upsert several summary records on filename in a single request
+
+        Each filename may appear only once per call. Falls back to
+        insert_summaries_bulk if the unique index on filename is missing.
+        Failed or pending records never replace a successful summary.
+
+        Args:
+            records: List of dictionaries shaped like insert_summary's data
+
+        Returns:
+            List of saved records (empty if failed)
+        """
+        records = self._without_success_overwrites(records)
+        if not records:
+            return []
+
+        try:
+            # One timestamp for the whole batch
+            now = _utc_now()
+            rows = [self._build_record(data, now) for data in records]
+
+            response = self.client.table(self.table_name).upsert(rows, on_conflict="filename").execute()
+            return response.data if response.data else []
+        except Exception as e:
+            print(f"Error upserting summaries, inserting instead: {str(e)}")
+            return self.insert_summaries_bulk(records)
+
+    def insert_summaries_bulk(self, records: List[Dict]) -> List[Dict]:
+        """
+        Insert several summary records in a single request
+
+        Args:
+            records: List of dictionaries shaped like insert_summary's data
+
+        Returns:
+            List of inserted records (empty if failed)
+        """
+        if not records:
+            return []
+
+        try:
+            # One timestamp for the whole batch
+            now = _utc_now()
+            rows = [self._build_record(data, now) for data in records]
+
+            response = self.client.table(self.table_name).insert(rows).execute()
+            return response.data if response.data else []
+        except Exception as e:
+            print(f"Error inserting summaries: {str(e)}")
+            return []
+
     def update_summary(self, record_id: int, data: Dict) -> Optional[Dict]:
         """
         Update an existing summary record
@@ -88,7 +235,7 @@ class SummaryDatabase:
             Updated record or None if failed
         """
         try:
-            data["updated_at"] = datetime.utcnow().isoformat()
+            data["updated_at"] = _utc_now()
             response = self.client.table(self.table_name)\
                 .update(data)\
                 .eq("id", record_id)\
@@ -98,36 +245,89 @@ class SummaryDatabase:
             print(f"Error updating summary: {str(e)}")
             return None
 
-    def get_all_summaries(self) -> List[Dict]:
+    def get_all_summaries(self, fields: str = "*", page_size: int = 1000) -> List[Dict]:
         """
         Retrieve all summary records
 
+        Rows are fetched a page at a time, since Supabase caps the rows
+        returned by a single request.
+
+        Args:
+            fields: Comma-separated columns to return; narrow it when the
+                summary texts aren't needed
+            page_size: Rows per request
+
         Returns:
             List of all summary records
         """
+        summaries = []
         try:
-            response = self.client.table(self.table_name)\
-                .select("*")\
-                .order("created_at", desc=True)\
-                .execute()
-            return response.data if response.data else []
+            while True:
+                response = self.client.table(self.table_name)\
+                    .select(fields)\
+                    .order("created_at", desc=True)\
+                    .order("id", desc=True)\
+                    .range(len(summaries), len(summaries) + page_size - 1)\
+                    .execute()
+                page = response.data or []
+                summaries.extend(page)
+                if len(page) < page_size:
+                    return summaries
         except Exception as e:
             print(f"Error fetching summaries: {str(e)}")
-            return []
+            return summaries
+
+    def get_latest_unique_summaries(self, page_size: int = 1000) -> List[Dict]:
+        """
+        Retrieve the latest summary record for every filename
+
+        Deduplicates in Postgres through the get_latest_unique_summaries
+        function from setup_supabase.sql, so older rows never leave the
+        database. Falls back to deduplicating get_all_summaries client-side
+        if the function is missing.
+
+        Args:
+            page_size: Rows per request
 
-    def get_summaries_by_session(self, session_start: datetime) -> List[Dict]:
+        Returns:
+            List of summary records, newest first
+        """
+        summaries = []
+        try:
+            while True:
+                response = self.client.rpc(
+                    "get_latest_unique_summaries",
+                    {"p_limit": page_size, "p_offset": len(summaries)}
+                ).execute()
+                page = response.data or []
+                summaries.extend(page)
+                if len(page) < page_size:
+                    return summaries
+        except Exception as e:
+            print(f"Error calling get_latest_unique_summaries, deduplicating locally: {str(e)}")
+
+        # Newest first, so the first row seen per file is its latest
+        latest = {}
+        for summary in self.get_all_summaries():
+            if summary.get("filename"):
+                latest.setdefault(summary["filename"], summary)
+        return list(latest.values())
+
+    def get_summaries_by_session(self, session_start: datetime, fields: str = "*") -> List[Dict]:
         """
         Get summaries created after a specific time
 
         Args:
             session_start: Start time for filtering
+            fields: Comma-separated columns to return; narrow it when the
+                summary texts aren't needed
 
         Returns:
             List of summary records
         """
         try:
             response = self.client.table(self.table_name)\
-                .select("*")\
+                .select(fields)\
                 .gte("created_at", session_start.isoformat())\
                 .order("created_at", desc=False)\
                 .execute()
@@ -156,24 +356,208 @@ class SummaryDatabase:
             print(f"Error deleting summary: {str(e)}")
             return False
 
-    def get_summary_by_filename(self, filename: str) -> Optional[Dict]:
+    def get_cached_summary(self, cache_key: str) -> Optional[Dict]:
+        """
+        Look up previously generated summaries for a cache key
+
+        Args:
+            cache_key: Hash of the document text, prompts and model
+
+        Returns:
+            Record with long_summary and short_summary, or None if not cached
+        """
+        try:
+            response = self.client.table(self.cache_table_name)\
+                .select("long_summary,short_summary")\
+                .eq("cache_key", cache_key)\
+                .limit(1)\
+                .execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            print(f"Error fetching cached summary: {str(e)}")
+            return None
+
+    def cache_summary(self, cache_key: str, long_summary: str, short_summary: str) -> bool:
+        """
+        Store generated summaries under a cache key
+
+        Args:
+            cache_key: Hash of the document text, prompts and model
+            long_summary: Generated long summary
+            short_summary: Generated short summary
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            self.client.table(self.cache_table_name)\
+                .upsert({
+                    "cache_key": cache_key,
+                    "long_summary": long_summary,
+                    "short_summary": short_summary,
+                    "created_at": _utc_now()
+                })\
+                .execute()
+            return True
+        except Exception as e:
+            print(f"Error caching summary: {str(e)}")
+            return False
+
+    def get_summary_by_filename(self, filename: str, fields: str = "*") -> Optional[Dict]:
         """
         Get the most recent summary for a specific filename
 
         Args:
             filename: Name of the file to search for
+            fields: Comma-separated columns to return; narrow it when the
+                summary texts aren't needed
 
         Returns:
             Summary record or None if not found
         """
         try:
             response = self.client.table(self.table_name)\
-                .select("*")\
+                .select(fields)\
                 .eq("filename", filename)\
                 .order("created_at", desc=True)\
+                .order("id", desc=True)\
                 .limit(1)\
                 .execute()
             return response.data[0] if response.data else None
         except Exception as e:
             print(f"Error fetching summary by filename: {str(e)}")
             return None
+
+
+    def get_summaries_by_filenames(self, filenames: List[str], batch_size: int = 100,
+                                   fields: str = "*") -> Dict[str, Dict]:
+        """
+        Get the most recent summary for each of several filenames
+
+        Filenames are sent in batches to keep the request URL short. The latest
+        row is picked client-side by comparing created_at strings: ISO 8601
+        timestamps in one format sort lexicographically, so nothing is parsed
+        and the server doesn't have to sort. Rows of one batch share created_at,
+        so ties go to the higher id, the row written last.
+
+        Args:
+            filenames: Names of the files to search for
+            batch_size: Number of filenames per request
+            fields: Comma-separated columns to return; must include filename
+
+        Returns:
+            Dictionary mapping filename to its latest summary record
+        """
+        if fields != "*":
+            columns = fields.split(",")
+            fields += "".join(f",{column}" for column in ("created_at", "id") if column not in columns)
+
+        summaries = {}
+        try:
+            for start in range(0, len(filenames), batch_size):
+                response = self.client.table(self.table_name)\
+                    .select(fields)\
+                    .in_("filename", filenames[start:start + batch_size])\
+                    .execute()
+
+                for record in response.data or []:
+                    filename = record.get("filename")
+                    current = summaries.get(filename)
+                    if current is None or _recency(record) > _recency(current):
+                        summaries[filename] = record
+        except Exception as e:
+            print(f"Error fetching summaries by filenames: {str(e)}")
+        return summaries
+
+
+class SummaryWriter:
+    """Queues summary writes and upserts them to Supabase in batches from a background thread"""
+
+    def __init__(self, database: SummaryDatabase, batch_size: int = 50, flush_interval: float = 3.0):
+        """
+        Initialize buffered writer
+
+        Args:
+            database: SummaryDatabase used for the bulk upserts
+            batch_size: Largest number of rows sent in one insert
+            flush_interval: Seconds to wait for more rows before sending a partial batch
+        """
+        self.database = database
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def _put(self, item):
+        """Queue an item, starting the writer thread if it is not running"""
+        with self._lock:
+            self._queue.put(item)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="summary-writer", daemon=True)
+                self._thread.start()
+
+    def queue_insert(self, data: Dict):
+        """
+        Queue a summary record for insertion
+
+        Returns immediately; safe to call from worker threads.
+
+        Args:
+            data: Dictionary shaped like SummaryDatabase.insert_summary's data
+        """
+        self._put(data)
+
+    def flush(self):
+        """Write all queued records and wait until they reach the database"""
+        self._put(_FLUSH)
+        self._queue.join()
+
+    def _run(self):
+        """Drain the queue in batches, exiting once it has been idle for a flush interval"""
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._thread = None
+                        return
+                continue
+
+            batch, taken = [], 0
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                taken += 1
+                if item is _FLUSH:
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+
+            try:
+                if batch:
+                    self._write(batch)
+            except Exception as e:
+                print(f"Error writing summaries: {str(e)}")
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+
+    def _write(self, rows: List[Dict]):
+        """Upsert one batch, keeping only the newest row per file"""
+        # An upsert can't touch the same filename twice, so keep only the newest row per file
+        latest = {}
+        for row in rows:
+            latest.pop(row.get("filename"), None)
+            latest[row.get("filename")] = row
+
+        self.database.upsert_summaries_bulk(list(latest.values()))
+
+
+# Queue marker that makes the writer send its partial batch immediately
+_FLUSH = object()
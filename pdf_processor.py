@@ -2,27 +2,98 @@
 PDF download and text extraction module
 """
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pdfplumber
 import os
+import gc
+import gzip
+import hashlib
+import io
+import math
+import multiprocessing
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional
 from urllib.parse import urlparse
 import re
 
+# Documents shorter than this are extracted in a single process
+MIN_PAGES_PER_POOL = 8
+
+# Pages handed to a pool worker at a time; small enough that little work is
+# wasted when the character budget is reached
+POOL_SEGMENT_PAGES = 16
+
+# Ruled lines and rectangles a page needs before PyMuPDF's table finder, which
+# only detects tables drawn with vector lines and is by far the slowest step, runs on it
+MIN_TABLE_RULINGS = 2
+
+# Stop extracting once this much text is collected, about four summarizer chunks
+MAX_EXTRACT_CHARS = 400000
+
+# pdfplumber fallback: run the garbage collector after this many pages
+GC_EVERY_PAGES = 10
+
+# Characters that are not allowed in filenames
+_SANITIZE_RE = re.compile(r'[<>:"/\\|?*]')
+
+try:
+    # MuPDF parses in C and is much faster than pdfplumber; pdfplumber stays as the fallback
+    import pymupdf
+except ImportError:
+    pymupdf = None
+
 
 class PDFProcessor:
     """Handles PDF downloading and text extraction"""
 
-    def __init__(self, download_folder: str = "files"):
+    def __init__(self, download_folder: str = "files", max_per_host: int = 4):
         """
         Initialize PDF processor
 
         Args:
             download_folder: Folder to store downloaded PDFs
+            max_per_host: Most downloads allowed to run against one host at a time
         """
         self.download_folder = download_folder
+        self.cache_folder = os.path.join(download_folder, ".cache")
         self._ensure_folder_exists()
 
+        # Caps concurrent downloads per host, however many threads call download_pdf
+        self.max_per_host = max_per_host
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_slots_lock = threading.Lock()
+
+        # Content hashes keyed by (path, mtime, size), so an unchanged file is hashed once
+        self._file_hashes: Dict[Tuple[str, int, int], str] = {}
+        self._file_hashes_lock = threading.Lock()
+
+        # One keep-alive session for all downloads, so repeated requests to a host
+        # reuse connections instead of paying a TCP and TLS handshake each time
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            # raise_on_status=False hands the last response back, so raise_for_status still reports the HTTP code
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504),
+                              allowed_methods=("GET", "HEAD"), raise_on_status=False)
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def close(self):
+        """Close the download session and its pooled connections"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def _ensure_folder_exists(self):
         """Create download folder if it doesn't exist"""
         Path(self.download_folder).mkdir(parents=True, exist_ok=True)
@@ -38,7 +109,7 @@ class PDFProcessor:
             Sanitized filename
         """
         # Remove invalid characters
-        filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
+        filename = _SANITIZE_RE.sub('_', filename)
         # Limit length
         if len(filename) > 200:
             name, ext = os.path.splitext(filename)
@@ -60,10 +131,65 @@ class PDFProcessor:
 
         # If no filename in URL, generate one
         if not filename or not filename.endswith('.pdf'):
-            filename = f"document_{hash(url) % 100000}.pdf"
+            # hash() is salted per process; blake2b keeps the name stable across runs
+            url_hash = int(hashlib.blake2b(url.encode(), digest_size=4).hexdigest(), 16)
+            filename = f"document_{url_hash % 100000}.pdf"
 
         return self._sanitize_filename(filename)
 
+    @contextmanager
+    def _host_slot(self, url: str):
+        """Hold one of the host's download slots for the duration of the block"""
+        host = urlparse(url).netloc.lower()
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+        with slot:
+            yield
+
+    def download_pdfs(self, urls: List[str], max_workers: int = 8) -> List[Tuple[str, bool, str, str]]:
+        """
+        Download several PDFs concurrently
+
+        Downloads share the keep-alive session and stay within max_per_host
+        connections per host to avoid being rate limited.
+
+        Args:
+            urls: PDF URLs
+            max_workers: Number of download threads
+
+        Returns:
+            List of (url, success, filepath, error_message) in the order of urls
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = pool.map(self.download_pdf, urls)
+            return [(url, *result) for url, result in zip(urls, results)]
+
+    def _non_pdf_content_type(self, url: str) -> Optional[str]:
+        """
+        Ask the server for the Content-Type of a URL without fetching its body
+
+        Any failure is treated as "don't know", so the GET still decides.
+
+        Args:
+            url: PDF file URL
+
+        Returns:
+            The Content-Type if the server reports something other than a PDF, else None
+        """
+        try:
+            with self.session.head(url, allow_redirects=True, timeout=10) as response:
+                if not response.ok:
+                    return None
+                content_type = response.headers.get('Content-Type', '')
+        except requests.exceptions.RequestException:
+            return None
+
+        if content_type and 'pdf' not in content_type.lower():
+            return content_type
+        return None
+
     def download_pdf(self, url: str, custom_filename: Optional[str] = None) -> Tuple[bool, str, str]:
         """
         Download PDF from URL
@@ -86,20 +212,39 @@ class PDFProcessor:
 
             filepath = os.path.join(self.download_folder, filename)
 
-            # Download with timeout
-            response = requests.get(url, timeout=30, stream=True)
-            response.raise_for_status()
-
-            # Check if content is PDF
-            content_type = response.headers.get('Content-Type', '')
-            if 'pdf' not in content_type.lower():
-                return False, "", f"URL does not point to a PDF file (Content-Type: {content_type})"
-
-            # Write to file
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-
+            with self._host_slot(url):
+                # URLs that don't look like a PDF get a cheap HEAD first, so pages
+                # and redirects to HTML are rejected before a GET is sent
+                if not urlparse(url).path.lower().endswith('.pdf'):
+                    content_type = self._non_pdf_content_type(url)
+                    if content_type:
+                        return False, "", f"URL does not point to a PDF file (Content-Type: {content_type})"
+
+                # Download with timeout; closing the response returns its connection to the pool
+                with self.session.get(url, timeout=30, stream=True) as response:
+                    response.raise_for_status()
+
+                    # Check if content is PDF
+                    content_type = response.headers.get('Content-Type', '')
+                    if 'pdf' not in content_type.lower():
+                        return False, "", f"URL does not point to a PDF file (Content-Type: {content_type})"
+
+                    # Write to a temporary file, hashing the chunks as they arrive so
+                    # the text cache lookup doesn't have to read the file back
+                    sha256 = hashlib.sha256()
+                    tmp_path = f"{filepath}.{os.getpid()}-{threading.get_ident()}.part"
+                    try:
+                        with open(tmp_path, 'wb') as f:
+                            for chunk in response.iter_content(chunk_size=65536):
+                                sha256.update(chunk)
+                                f.write(chunk)
+                        # Readers and concurrent downloads of the same name never see a partial file
+                        os.replace(tmp_path, filepath)
+                    finally:
+                        if os.path.exists(tmp_path):
+                            os.remove(tmp_path)
+
+            self.remember_hash(filepath, sha256.hexdigest())
             return True, filepath, ""
 
         except requests.exceptions.Timeout:
@@ -111,55 +256,344 @@ class PDFProcessor:
         except Exception as e:
             return False, "", f"Unexpected error: {str(e)}"
 
-    def extract_text_and_tables(self, filepath: str) -> Tuple[bool, str, str]:
+    def extract_text_and_tables(self, filepath: str, processes: int = 1) -> Tuple[bool, str, str]:
         """
         Extract text and tables from PDF
 
         Args:
             filepath: Path to PDF file
+            processes: Worker processes to split the pages across; keep 1 when
+                files are already being extracted in parallel
 
         Returns:
             Tuple of (success: bool, extracted_text: str, error_message: str)
         """
         try:
-            extracted_content = []
+            full_text = None
+            if pymupdf is not None:
+                try:
+                    full_text = self._join_parts(self._extract_with_pymupdf(filepath, processes))
+                except Exception as e:
+                    print(f"PyMuPDF extraction failed, retrying with pdfplumber: {str(e)}")
+            if full_text is None:
+                full_text = self._join_parts(self._extract_with_pdfplumber(filepath))
+
+            if not full_text.strip():
+                return False, "", "No text content extracted from PDF"
 
-            with pdfplumber.open(filepath) as pdf:
-                total_pages = len(pdf.pages)
+            return True, full_text, ""
 
-                # Limit pages for very large PDFs
-                max_pages = min(total_pages, 100)  # Process max 100 pages
+        except Exception as e:
+            return False, "", f"PDF extraction error: {str(e)}"
 
-                for page_num, page in enumerate(pdf.pages[:max_pages], 1):
-                    # Extract text
-                    text = page.extract_text()
-                    if text:
-                        extracted_content.append(f"\n--- Page {page_num} ---\n")
-                        extracted_content.append(text)
+    @staticmethod
+    def _join_parts(parts: Iterable[str]) -> str:
+        """
+        Join text parts with newlines as they are produced
 
-                    # Extract tables
-                    tables = page.extract_tables()
-                    if tables:
-                        for table_idx, table in enumerate(tables, 1):
-                            extracted_content.append(f"\n[Table {table_idx} on Page {page_num}]\n")
-                            # Convert table to text format
-                            for row in table:
-                                row_text = " | ".join([str(cell) if cell else "" for cell in row])
-                                extracted_content.append(row_text)
-                            extracted_content.append("")
+        Writing into one buffer avoids holding every part in a list next to
+        the joined copy.
 
-                if total_pages > max_pages:
-                    extracted_content.append(f"\n[Note: Only first {max_pages} pages processed out of {total_pages} total pages]")
+        Args:
+            parts: Text parts, typically a page generator
 
-            full_text = "\n".join(extracted_content)
+        Returns:
+            Joined text
+        """
+        buffer = io.StringIO()
+        for index, part in enumerate(parts):
+            if index:
+                buffer.write("\n")
+            buffer.write(part)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _format_page(page_num: int, text: str, tables: list) -> list:
+        """
+        Lay out one page's text and tables as lines of the extracted text
 
-            if not full_text.strip():
-                return False, "", "No text content extracted from PDF"
+        Args:
+            page_num: 1-based page number
+            text: Page text
+            tables: Tables on the page, each a list of rows of cells
 
-            return True, full_text, ""
+        Returns:
+            List of text parts for the page
+        """
+        parts = []
+        if text:
+            parts.append(f"\n--- Page {page_num} ---\n")
+            parts.append(text)
+
+        for table_idx, table in enumerate(tables, 1):
+            parts.append(f"\n[Table {table_idx} on Page {page_num}]\n")
+            # Convert table to text format
+            parts.extend(" | ".join(str(cell) if cell else "" for cell in row) for row in table)
+            parts.append("")
 
+        return parts
+
+    @staticmethod
+    def _within_budget(pages: Iterable[List[str]], total_pages: int) -> Iterator[str]:
+        """
+        Pass pages through until the character budget is used up
+
+        Args:
+            pages: Text parts of each page, one list per page, in order
+            total_pages: Number of pages in the document
+
+        Yields:
+            Text parts, followed by a note if pages were left out
+        """
+        total_chars = 0
+        for pages_done, parts in enumerate(pages, 1):
+            yield from parts
+            total_chars += sum(len(part) for part in parts)
+
+            if total_chars >= MAX_EXTRACT_CHARS and pages_done < total_pages:
+                yield f"\n[Note: Only first {pages_done} pages processed out of {total_pages} total pages]"
+                return
+
+    def _extract_with_pymupdf(self, filepath: str, processes: int = 1) -> Iterator[str]:
+        """
+        Extract text and tables with PyMuPDF
+
+        Args:
+            filepath: Path to PDF file
+            processes: Worker processes to split the pages across
+
+        Yields:
+            Text parts in page order
+        """
+        with pymupdf.open(filepath) as doc:
+            total_pages = doc.page_count
+
+        # Starting a pool costs more than it saves on short documents
+        processes = min(processes, total_pages)
+        if processes > 1 and total_pages >= MIN_PAGES_PER_POOL:
+            # Documents can't be pickled, so each worker opens the file for its own slice
+            segment_size = min(math.ceil(total_pages / processes), POOL_SEGMENT_PAGES)
+            segments = [
+                (filepath, start, min(start + segment_size, total_pages))
+                for start in range(0, total_pages, segment_size)
+            ]
+            with multiprocessing.Pool(processes) as pool:
+                # imap keeps the segments, and so the pages, in order; leaving
+                # the block early terminates the segments still running
+                pages = (page for segment in pool.imap(_extract_pymupdf_pages, segments) for page in segment)
+                yield from self._within_budget(pages, total_pages)
+        else:
+            # One page at a time, so only the current page is held besides the output
+            yield from self._within_budget(_iter_pymupdf_pages(filepath, 0, total_pages), total_pages)
+
+    def _extract_with_pdfplumber(self, filepath: str) -> Iterator[str]:
+        """
+        Extract text and tables with pdfplumber
+
+        Args:
+            filepath: Path to PDF file
+
+        Yields:
+            Text parts in page order
+        """
+        with pdfplumber.open(filepath) as pdf:
+            def pages():
+                for page_num, page in enumerate(pdf.pages, 1):
+                    parts = self._format_page(page_num, page.extract_text(), page.extract_tables())
+
+                    # pdfplumber keeps each parsed page's layout objects until released
+                    page.close()
+                    if page_num % GC_EVERY_PAGES == 0:
+                        gc.collect()
+                    yield parts
+
+            yield from self._within_budget(pages(), len(pdf.pages))
+
+    def remember_hash(self, filepath: str, digest: str):
+        """
+        Record a content hash computed elsewhere, such as while downloading or
+        in an extraction worker process
+
+        Args:
+            filepath: Path to the file
+            digest: SHA-256 hex digest of its current contents
+        """
+        stat = os.stat(filepath)
+        with self._file_hashes_lock:
+            self._file_hashes[(os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size)] = digest
+
+    def file_hash(self, filepath: str) -> str:
+        """
+        Get the SHA-256 of a file's contents
+
+        Args:
+            filepath: Path to the file
+
+        Returns:
+            Hex digest
+        """
+        stat = os.stat(filepath)
+        key = (os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size)
+        with self._file_hashes_lock:
+            digest = self._file_hashes.get(key)
+        if digest:
+            return digest
+
+        sha256 = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                sha256.update(block)
+        digest = sha256.hexdigest()
+
+        with self._file_hashes_lock:
+            self._file_hashes[key] = digest
+        return digest
+
+    def text_cache_path(self, filepath: str) -> str:
+        """
+        Get the cache file for a PDF's extracted text
+
+        Entries are keyed by a hash of the PDF's contents, so the same document
+        downloaded from another URL or under another name reuses the
+        extraction, and a changed PDF never matches an old entry.
+
+        Args:
+            filepath: Path to PDF file
+
+        Returns:
+            Path to the gzip-compressed text cache file
+        """
+        return os.path.join(self.cache_folder, f"{self.file_hash(filepath)}.txt.gz")
+
+    @staticmethod
+    def read_cached_text(cache_path: str) -> str:
+        """
+        Read extracted text from a cache file
+
+        Args:
+            cache_path: Path returned by text_cache_path
+
+        Returns:
+            Extracted text
+        """
+        with gzip.open(cache_path, 'rt', encoding='utf-8') as f:
+            return f.read()
+
+    def _write_cached_text(self, cache_path: str, text: str):
+        """
+        Store extracted text
+
+        Args:
+            cache_path: Path returned by text_cache_path
+            text: Extracted text
+        """
+        try:
+            Path(self.cache_folder).mkdir(parents=True, exist_ok=True)
+
+            # Write to a temporary file first so concurrent readers never see a partial file
+            tmp_path = f"{cache_path}.{os.getpid()}-{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=3) as f:
+                f.write(text)
+            os.replace(tmp_path, cache_path)
         except Exception as e:
-            return False, "", f"PDF extraction error: {str(e)}"
+            print(f"Error caching extracted text: {str(e)}")
+
+    def extract_text_cached(self, filepath: str, processes: int = 1,
+                            force_refresh: bool = False) -> Tuple[bool, str, str]:
+        """
+        Extract text and tables, reusing an earlier extraction of the same content
+
+        Args:
+            filepath: Path to PDF file
+            processes: Worker processes for a fresh extraction, see extract_text_and_tables
+            force_refresh: Extract again and overwrite the cached text
+
+        Returns:
+            Tuple of (success: bool, extracted_text: str, error_message: str)
+        """
+        try:
+            cache_path = self.text_cache_path(filepath)
+            if not force_refresh and os.path.exists(cache_path):
+                return True, self.read_cached_text(cache_path), ""
+        except Exception:
+            cache_path = None
+
+        success, text, error = self.extract_text_and_tables(filepath, processes)
+        if success and cache_path:
+            self._write_cached_text(cache_path, text)
+
+        return success, text, error
+
+    def prune_text_cache(self, rehash: bool = False) -> int:
+        """
+        Remove cached texts whose hash matches no PDF in the download folder
+
+        Entries are keyed by content, so a changed or deleted PDF leaves its
+        old entry behind. By default only hashes already known to this process
+        are used, so nothing is read from disk: if every current PDF is known,
+        all other entries go; otherwise only entries for files known to have
+        changed or disappeared do. With rehash, unknown PDFs are hashed first,
+        which reads them in full.
+
+        The cache is listed before the PDFs, so an entry written meanwhile
+        always belongs to a file that is already listed.
+
+        Args:
+            rehash: Hash PDFs this process hasn't seen, to find every orphan
+
+        Returns:
+            Number of entries removed
+        """
+        try:
+            with os.scandir(self.cache_folder) as entries:
+                cached = {
+                    e.name[:-len('.txt.gz')]: e.path
+                    for e in entries if e.name.endswith('.txt.gz') and e.is_file()
+                }
+        except FileNotFoundError:
+            return 0
+        if not cached:
+            return 0
+
+        current_keys = set()
+        try:
+            with os.scandir(self.download_folder) as entries:
+                for e in entries:
+                    if e.name.endswith('.pdf') and e.is_file():
+                        stat = e.stat()
+                        current_keys.add((os.path.abspath(e.path), stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            pass
+
+        with self._file_hashes_lock:
+            known = dict(self._file_hashes)
+        live = {known[key] for key in current_keys if key in known}
+        unknown = [key[0] for key in current_keys if key not in known]
+
+        if rehash:
+            for path in unknown:
+                try:
+                    live.add(self.file_hash(path))
+                except OSError:
+                    pass
+            unknown = []
+
+        if unknown:
+            # Unknown files may own any entry, so only drop hashes of files seen to change
+            orphans = {digest for key, digest in known.items() if key not in current_keys} - live
+        else:
+            orphans = set(cached) - live
+
+        removed = 0
+        for digest in orphans:
+            path = cached.get(digest)
+            if path:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
 
     def process_pdf(self, url: str) -> Tuple[bool, str, str, str]:
         """
@@ -179,7 +613,7 @@ class PDFProcessor:
         filename = os.path.basename(filepath)
 
         # Extract text
-        success, text, error = self.extract_text_and_tables(filepath)
+        success, text, error = self.extract_text_cached(filepath)
         if not success:
             return False, filename, "", error
 
@@ -213,10 +647,10 @@ class PDFProcessor:
             List of PDF filenames
         """
         try:
-            if not os.path.exists(self.download_folder):
-                return []
-            files = [f for f in os.listdir(self.download_folder) if f.endswith('.pdf')]
-            return sorted(files)
+            with os.scandir(self.download_folder) as entries:
+                return sorted(e.name for e in entries if e.name.endswith('.pdf') and e.is_file())
+        except FileNotFoundError:
+            return []
         except Exception as e:
             print(f"Error listing files: {str(e)}")
             return []
@@ -245,3 +679,82 @@ class PDFProcessor:
             Expected filename
         """
         return self._get_filename_from_url(url)
+
+
+def _has_ruling_lines(page) -> bool:
+    """
+    Check whether a PyMuPDF page has enough vector lines to hold a table
+
+    Args:
+        page: PyMuPDF page
+
+    Returns:
+        True if the page has at least MIN_TABLE_RULINGS lines or rectangles
+    """
+    rulings = 0
+    for drawing in page.get_cdrawings():
+        rulings += sum(1 for item in drawing['items'] if item[0] in ('l', 're'))
+        if rulings >= MIN_TABLE_RULINGS:
+            return True
+    return False
+
+
+def _iter_pymupdf_pages(filepath: str, start: int, stop: int) -> Iterator[List[str]]:
+    """
+    Extract text and tables from a range of pages with PyMuPDF
+
+    Args:
+        filepath: Path to PDF file
+        start: Index of the first page
+        stop: Index one past the last page
+
+    Yields:
+        Text parts of each page, one list per page, in order
+    """
+    # Closing frees MuPDF's buffers right away instead of waiting for garbage collection
+    with pymupdf.open(filepath) as doc:
+        for page_index in range(start, stop):
+            page = doc.load_page(page_index)
+            tables = []
+            if _has_ruling_lines(page):
+                tables = [table.extract() for table in page.find_tables().tables]
+            yield PDFProcessor._format_page(page_index + 1, page.get_text("text"), tables)
+
+
+def _extract_pymupdf_pages(segment: Tuple[str, int, int]) -> list:
+    """
+    Extract a range of pages as a list; module-level so multiprocessing workers can run it
+
+    Args:
+        segment: (filepath, start, stop) with stop one past the last page index
+
+    Returns:
+        List of per-page part lists, in order
+    """
+    return list(_iter_pymupdf_pages(*segment))
+
+
+def extract_to_cache(download_folder: str, filepath: str) -> Tuple[bool, str, str]:
+    """
+    Extract a PDF into the text cache of its download folder
+
+    Module-level so it can run in a ProcessPoolExecutor; only the status and
+    the content hash are returned, so the extracted text isn't pickled back to
+    the parent process. Hand the hash to the parent's PDFProcessor.remember_hash
+    so the file isn't hashed a second time there.
+
+    Args:
+        download_folder: Download folder the cache belongs to
+        filepath: Path to PDF file
+
+    Returns:
+        Tuple of (success: bool, error_message: str, sha256: str), the hash
+        empty if the file couldn't be read
+    """
+    processor = PDFProcessor(download_folder)
+    success, _, error = processor.extract_text_cached(filepath)
+    try:
+        digest = processor.file_hash(filepath)
+    except OSError:
+        digest = ''
+    return success, error, digest
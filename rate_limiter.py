@@ -0,0 +1,68 @@
+"""
+Rate limiting for AI provider requests shared across worker threads
+"""
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Token-bucket limiter that only blocks once the burst allowance is spent"""
+
+    def __init__(self, rate_per_min: int, capacity: Optional[int] = None):
+        """
+        Initialize token bucket
+
+        Args:
+            rate_per_min: Sustained request ceiling of the provider
+            capacity: Burst size; defaults to a tenth of a minute's allowance
+        """
+        self.rate = max(1, rate_per_min) / 60.0
+        self.capacity = capacity or max(1, rate_per_min // 10)
+        self._tokens = float(self.capacity)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        """Add the tokens earned since the last refill"""
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+
+                if now >= self._blocked_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = max(self._blocked_until - now, (1 - self._tokens) / self.rate)
+
+            time.sleep(wait)
+
+    def penalize(self, retry_after: float):
+        """
+        Pause every caller after the provider rejected a request
+
+        Args:
+            retry_after: Seconds to back off, usually from the Retry-After header
+        """
+        with self._lock:
+            self._tokens = 0.0
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+    def observe_remaining(self, remaining: Optional[int]):
+        """
+        Shrink the bucket to the provider's reported remaining requests
+
+        Args:
+            remaining: Value of the provider's remaining-requests header, if sent
+        """
+        if remaining is None:
+            return
+        with self._lock:
+            self._tokens = min(self._tokens, float(remaining))
@@ -1,10 +1,98 @@
 """
 Excel report generation module
 """
-import pandas as pd
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Dict, Iterable, List, Optional
+import io
 import os
+import xlsxwriter
+
+HEADER_FORMAT = {'bold': True}
+BODY_FORMAT = {'text_wrap': True, 'valign': 'top'}
+
+# Excel's limit on characters in one cell; xlsxwriter silently drops longer strings
+MAX_CELL_CHARS = 32767
+TRUNCATION_MARKER = "\n[Truncated: exceeds Excel's cell limit]"
+
+# constant_memory flushes each row to disk once the next one starts, so memory
+# stays flat however many rows there are; cell text is written as-is, never
+# turned into formulas or hyperlinks
+WORKBOOK_OPTIONS = {
+    'constant_memory': True,
+    'strings_to_formulas': False,
+    'strings_to_urls': False,
+}
+
+
+def _report_filename(output_filename: Optional[str], prefix: str) -> str:
+    """
+    Resolve the report filename, defaulting to a timestamped name
+
+    Args:
+        output_filename: Optional custom filename
+        prefix: Prefix for the generated name
+
+    Returns:
+        Filename ending in .xlsx
+    """
+    if not output_filename:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output_filename = f'{prefix}_{timestamp}.xlsx'
+
+    if not output_filename.endswith('.xlsx'):
+        output_filename += '.xlsx'
+
+    return output_filename
+
+
+def _cell_value(value):
+    """
+    Fit a value into one Excel cell, truncating long text with a marker
+
+    Args:
+        value: Cell value
+
+    Returns:
+        The value, or the text cut to MAX_CELL_CHARS including the marker
+    """
+    if isinstance(value, str) and len(value) > MAX_CELL_CHARS:
+        return value[:MAX_CELL_CHARS - len(TRUNCATION_MARKER)] + TRUNCATION_MARKER
+    return value
+
+
+def _write_excel(rows: Iterable[List], headers: List[str], sheet_name: str, column_widths: Dict[str, int],
+                 output, auto_filter: bool = False):
+    """
+    Stream rows into a formatted sheet: column widths, wrapped body, bold header
+
+    Rows are written in order and never held together, so any iterable works.
+
+    Args:
+        rows: Cell values of each data row
+        headers: Column headers
+        sheet_name: Name of the worksheet
+        column_widths: Column letter to width
+        output: File path or binary buffer
+        auto_filter: Whether to add an auto-filter over the data
+    """
+    workbook = xlsxwriter.Workbook(output, WORKBOOK_OPTIONS)
+    try:
+        worksheet = workbook.add_worksheet(sheet_name)
+        header_format = workbook.add_format(HEADER_FORMAT)
+        body_format = workbook.add_format(BODY_FORMAT)
+
+        for col, width in column_widths.items():
+            worksheet.set_column(f'{col}:{col}', width)
+
+        worksheet.write_row(0, 0, headers, header_format)
+        last_row = 0
+        for last_row, values in enumerate(rows, 1):
+            worksheet.write_row(last_row, 0, [_cell_value(value) for value in values], body_format)
+
+        if auto_filter:
+            worksheet.autofilter(0, 0, last_row, len(headers) - 1)
+    finally:
+        workbook.close()
 
 
 class ReportGenerator:
@@ -25,68 +113,31 @@ class ReportGenerator:
         Returns:
             Path to generated Excel file
         """
-        # Prepare data for DataFrame
-        report_data = []
-
-        for summary in summaries:
-            report_data.append({
-                'URL': summary.get('url', ''),
-                'Filename': summary.get('filename', ''),
-                'Status': summary.get('status', ''),
-                'Long Summary': summary.get('long_summary', ''),
-                'Short Summary': summary.get('short_summary', ''),
-                'Error Message': summary.get('error_message', ''),
-                'Created At': summary.get('created_at', ''),
-            })
-
-        # Create DataFrame
-        df = pd.DataFrame(report_data)
-
-        # Generate filename
-        if not output_filename:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            output_filename = f'summary_report_{timestamp}.xlsx'
-
-        # Ensure .xlsx extension
-        if not output_filename.endswith('.xlsx'):
-            output_filename += '.xlsx'
-
-        # Create Excel writer with formatting
-        with pd.ExcelWriter(output_filename, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Summaries', index=False)
-
-            # Get the worksheet
-            worksheet = writer.sheets['Summaries']
-
-            # Set column widths
-            column_widths = {
-                'A': 50,  # URL
-                'B': 30,  # Filename
-                'C': 15,  # Status
-                'D': 80,  # Long Summary
-                'E': 60,  # Short Summary
-                'F': 40,  # Error Message
-                'G': 20,  # Created At
-            }
-
-            for col, width in column_widths.items():
-                worksheet.column_dimensions[col].width = width
-
-            # Enable text wrapping for summary columns
-            from openpyxl.styles import Alignment
-
-            for row in worksheet.iter_rows(min_row=2, max_row=worksheet.max_row):
-                for cell in row:
-                    cell.alignment = Alignment(wrap_text=True, vertical='top')
-
-            # Make header bold
-            from openpyxl.styles import Font
-
-            for cell in worksheet[1]:
-                cell.font = Font(bold=True)
-
-            # Add auto-filter
-            worksheet.auto_filter.ref = worksheet.dimensions
+        output_filename = _report_filename(output_filename, 'summary_report')
+
+        headers = ['URL', 'Filename', 'Status', 'Long Summary', 'Short Summary', 'Error Message', 'Created At']
+        rows = (
+            [
+                summary.get('url', ''),
+                summary.get('filename', ''),
+                summary.get('status', ''),
+                summary.get('long_summary', ''),
+                summary.get('short_summary', ''),
+                summary.get('error_message', ''),
+                summary.get('created_at', ''),
+            ]
+            for summary in summaries
+        )
+        column_widths = {
+            'A': 50,  # URL
+            'B': 30,  # Filename
+            'C': 15,  # Status
+            'D': 80,  # Long Summary
+            'E': 60,  # Short Summary
+            'F': 40,  # Error Message
+            'G': 20,  # Created At
+        }
+        _write_excel(rows, headers, 'Summaries', column_widths, output_filename, auto_filter=True)
 
         return output_filename
 
@@ -107,7 +158,26 @@ class ReportGenerator:
         Create Excel report for downloads (Tab 1)
         Columns: Link, File Name, Download Status/Error
         """
-        report_data = []
+        output_filename = _report_filename(output_filename, 'download_report')
+        self._write_download_report(results, output_filename)
+        return output_filename
+
+    def create_download_report_bytes(self, results: List[Dict]) -> bytes:
+        """
+        Create the download report (Tab 1) in memory
+
+        Returns:
+            Contents of the .xlsx file
+        """
+        buffer = io.BytesIO()
+        self._write_download_report(results, buffer)
+        return buffer.getvalue()
+
+    def _write_download_report(self, results: List[Dict], output):
+        """
+        Write the download report to a file path or binary buffer
+        """
+        rows = []
         for result in results:
             status = result.get('download_status', 'pending')
             error = result.get('download_error', '')
@@ -117,98 +187,71 @@ class ReportGenerator:
             elif status == 'skipped':
                 status_msg = "Already Exists"
             
-            report_data.append({
-                'Link': result.get('url', ''),
-                'File Name': result.get('filename', ''),
-                'Download Status': status_msg
-            })
-            
-        df = pd.DataFrame(report_data)
-        
-        if not output_filename:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            output_filename = f'download_report_{timestamp}.xlsx'
-            
-        if not output_filename.endswith('.xlsx'):
-            output_filename += '.xlsx'
-            
-        with pd.ExcelWriter(output_filename, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Downloads', index=False)
-            worksheet = writer.sheets['Downloads']
-            
-            # Formatting
-            worksheet.column_dimensions['A'].width = 60
-            worksheet.column_dimensions['B'].width = 40
-            worksheet.column_dimensions['C'].width = 50
-            
-            from openpyxl.styles import Alignment, Font
-            for row in worksheet.iter_rows(min_row=2, max_row=worksheet.max_row):
-                for cell in row:
-                    cell.alignment = Alignment(wrap_text=True, vertical='top')
-            for cell in worksheet[1]:
-                cell.font = Font(bold=True)
-                
-        return output_filename
+            rows.append([result.get('url', ''), result.get('filename', ''), status_msg])
 
-    def create_summary_report(self, summaries: List[Dict], download_folder: str, output_filename: Optional[str] = None) -> str:
+        _write_excel(rows, ['Link', 'File Name', 'Download Status'], 'Downloads', {'A': 60, 'B': 40, 'C': 50}, output)
+
+    def create_summary_report(self, summaries: Iterable[Dict], download_folder: str, output_filename: Optional[str] = None) -> str:
         """
         Create Excel report for summaries (Tab 2)
         Columns: Link, File Name, Long Summary, Short Summary, Date Downloaded, Date Summarized
         """
-        report_data = []
-        for summary in summaries:
-            filename = summary.get('filename', '')
-            
-            # Get date downloaded from file system
-            date_downloaded = "Unknown"
-            if filename and download_folder:
-                filepath = os.path.join(download_folder, filename)
-                if os.path.exists(filepath):
-                    timestamp = os.path.getmtime(filepath)
-                    date_downloaded = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
-            
-            # Get date summarized
-            date_summarized = summary.get('created_at', '')
-            if summary.get('status') != 'success':
-                date_summarized = f"Failed: {summary.get('error_message', 'Unknown error')}"
-            
-            report_data.append({
-                'Link': summary.get('url', ''),
-                'File Name': filename,
-                'Long Summary': summary.get('long_summary', ''),
-                'Short Summary': summary.get('short_summary', ''),
-                'Error Message': summary.get('error_message', ''),
-                'Date Downloaded': date_downloaded,
-                'Date Summarized': date_summarized
-            })
-            
-        df = pd.DataFrame(report_data)
-        
-        if not output_filename:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            output_filename = f'summary_report_{timestamp}.xlsx'
-            
-        if not output_filename.endswith('.xlsx'):
-            output_filename += '.xlsx'
-            
-        with pd.ExcelWriter(output_filename, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Summaries', index=False)
-            worksheet = writer.sheets['Summaries']
-            
-            # Formatting
-            column_widths = {'A': 50, 'B': 30, 'C': 80, 'D': 60, 'E': 40, 'F': 20, 'G': 20}
-            for col, width in column_widths.items():
-                worksheet.column_dimensions[col].width = width
-            
-            from openpyxl.styles import Alignment, Font
-            for row in worksheet.iter_rows(min_row=2, max_row=worksheet.max_row):
-                for cell in row:
-                    cell.alignment = Alignment(wrap_text=True, vertical='top')
-            for cell in worksheet[1]:
-                cell.font = Font(bold=True)
-                
+        output_filename = _report_filename(output_filename, 'summary_report')
+        self._write_summary_report(summaries, download_folder, output_filename)
         return output_filename
 
+    def create_summary_report_bytes(self, summaries: Iterable[Dict], download_folder: str) -> bytes:
+        """
+        Create the summary report (Tab 2) in memory
+
+        Returns:
+            Contents of the .xlsx file
+        """
+        buffer = io.BytesIO()
+        self._write_summary_report(summaries, download_folder, buffer)
+        return buffer.getvalue()
+
+    def _write_summary_report(self, summaries: Iterable[Dict], download_folder: str, output):
+        """
+        Write the summary report to a file path or binary buffer
+
+        Summaries are read in a single pass, so any iterable works.
+        """
+        # One directory pass instead of two stat() calls per row
+        download_times = {}
+        if download_folder and os.path.isdir(download_folder):
+            with os.scandir(download_folder) as entries:
+                download_times = {e.name: e.stat().st_mtime for e in entries if e.is_file()}
+
+        def rows():
+            for summary in summaries:
+                filename = summary.get('filename', '')
+
+                # Get date downloaded from file system
+                date_downloaded = "Unknown"
+                timestamp = download_times.get(filename)
+                if timestamp is not None:
+                    date_downloaded = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+
+                # Get date summarized
+                date_summarized = summary.get('created_at', '')
+                if summary.get('status') != 'success':
+                    date_summarized = f"Failed: {summary.get('error_message', 'Unknown error')}"
+
+                yield [
+                    summary.get('url', ''),
+                    filename,
+                    summary.get('long_summary', ''),
+                    summary.get('short_summary', ''),
+                    summary.get('error_message', ''),
+                    date_downloaded,
+                    date_summarized
+                ]
+
+        headers = ['Link', 'File Name', 'Long Summary', 'Short Summary', 'Error Message', 'Date Downloaded', 'Date Summarized']
+        column_widths = {'A': 50, 'B': 30, 'C': 80, 'D': 60, 'E': 40, 'F': 20, 'G': 20}
+        _write_excel(rows(), headers, 'Summaries', column_widths, output)
+
     def get_summary_statistics(self, summaries: List[Dict]) -> Dict:
         """
         Calculate statistics from summaries
@@ -19,6 +19,18 @@ CREATE INDEX IF NOT EXISTS idx_created_at ON pdf_summaries(created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_status ON pdf_summaries(status);
 CREATE INDEX IF NOT EXISTS idx_url ON pdf_summaries(url);
 
+-- One row per file, so new results update it in place (upsert on filename).
+-- Existing installs: drop older duplicates first, keeping each file's latest row
+DELETE FROM pdf_summaries a
+    USING pdf_summaries b
+    WHERE a.filename = b.filename
+      AND (a.created_at, a.id) < (b.created_at, b.id);
+CREATE UNIQUE INDEX IF NOT EXISTS pdf_summaries_filename_key ON pdf_summaries(filename);
+
+-- The unique index above also serves the latest-summary-per-file lookups.
+-- Only if you skip it and keep every attempt as its own row, index the lookup instead:
+-- CREATE INDEX IF NOT EXISTS pdf_summaries_filename_created_idx ON pdf_summaries(filename, created_at DESC);
+
 -- Add a trigger to automatically update the updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -33,6 +45,28 @@ CREATE TRIGGER update_pdf_summaries_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+-- Latest row per filename, deduplicated in the database for the summary export.
+-- Paged with p_limit/p_offset because Supabase caps rows per response
+CREATE OR REPLACE FUNCTION get_latest_unique_summaries(p_limit INTEGER DEFAULT 1000, p_offset INTEGER DEFAULT 0)
+RETURNS SETOF pdf_summaries AS $$
+    SELECT * FROM (
+        SELECT DISTINCT ON (filename) *
+        FROM pdf_summaries
+        ORDER BY filename, created_at DESC, id DESC
+    ) latest
+    ORDER BY created_at DESC, id DESC
+    LIMIT p_limit OFFSET p_offset;
+$$ LANGUAGE sql STABLE;
+
+-- Cache of generated summaries keyed by a hash of document text, prompts and model,
+-- so identical documents are not sent to the AI provider twice
+CREATE TABLE IF NOT EXISTS summary_cache (
+    cache_key TEXT PRIMARY KEY,
+    long_summary TEXT,
+    short_summary TEXT,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
 -- Optional: Add comments to columns for documentation
 COMMENT ON TABLE pdf_summaries IS 'Stores PDF summary data including URLs, extracted content, and AI-generated summaries';
 COMMENT ON COLUMN pdf_summaries.url IS 'Original URL of the PDF file';
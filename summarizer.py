@@ -4,22 +4,60 @@ AI-powered summarization module supporting Claude and OpenAI
 from anthropic import Anthropic
 from openai import OpenAI
 from typing import Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+import json
+import threading
 import time
 
+# Largest text sent to the provider in one request
+CHUNK_MAX_CHARS = 100000
+
+# Chunk requests of one document that may be in flight at the same time
+MAX_CONCURRENT_CHUNKS = 5
+
+# Pause before the short summary only when the provider reports this few requests left
+LOW_REMAINING_REQUESTS = 2
+LOW_REMAINING_PAUSE = 2.0
+
+# Output budget of a single summary, and of the combined call that returns both;
+# gpt-4-turbo can't produce more than 4096 tokens, so OpenAI stays at that
+MAX_OUTPUT_TOKENS = 4096
+COMBINED_MAX_OUTPUT_TOKENS = 8192
+
+# Asks for both summaries in one response
+COMBINED_PROMPT_TEMPLATE = """Write two summaries of the document.
+
+Instructions for the long summary:
+{long_prompt}
+
+Instructions for the short summary:
+{short_prompt}
+
+Respond with only a JSON object of the form {{"long_summary": "...", "short_summary": "..."}}."""
+
 
 class Summarizer:
     """Handles text summarization using Claude or OpenAI"""
 
-    def __init__(self, provider: str, api_key: str):
+    def __init__(self, provider: str, api_key: str, enable_prompt_cache: bool = False):
         """
         Initialize summarizer with chosen provider
 
         Args:
             provider: 'claude' or 'openai'
             api_key: API key for the chosen provider
+            enable_prompt_cache: Send the prompt as a cached system block (Claude only)
         """
         self.provider = provider.lower()
         self.api_key = api_key
+        self.enable_prompt_cache = enable_prompt_cache and self.provider == 'claude'
+        # Running total of prompt tokens served from Anthropic's prompt cache; the
+        # instance is shared by every session's worker threads, hence the lock
+        self.cache_read_input_tokens = 0
+        self._usage_lock = threading.Lock()
+        # Rate-limit headers of the last response and cached tokens used so far,
+        # tracked per calling thread
+        self._rate_limit = threading.local()
 
         try:
             if self.provider == 'claude':
@@ -52,6 +90,60 @@ class Summarizer:
         except Exception as e:
             raise ValueError(f"Failed to initialize {provider} client: {str(e)}")
 
+    @property
+    def requests_remaining(self) -> Optional[int]:
+        """Requests left in the provider's window, as reported to this thread's last call"""
+        return getattr(self._rate_limit, 'remaining', None)
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds the provider asked this thread's last failed call to back off"""
+        return getattr(self._rate_limit, 'retry_after', 0.0)
+
+    @property
+    def thread_cache_read_tokens(self) -> int:
+        """Prompt-cache tokens used by this thread's calls, including the chunk calls they fanned out"""
+        return getattr(self._rate_limit, 'cache_read_tokens', 0)
+
+    def _record_cache_read(self, tokens: int):
+        """
+        Count prompt tokens served from the prompt cache
+
+        Args:
+            tokens: Cached tokens reported for one response
+        """
+        self._rate_limit.cache_read_tokens = self.thread_cache_read_tokens + tokens
+        with self._usage_lock:
+            self.cache_read_input_tokens += tokens
+
+    def _record_rate_limit(self, headers):
+        """
+        Remember the rate-limit headers of a provider response
+
+        Args:
+            headers: Response headers (Anthropic or OpenAI-compatible)
+        """
+        remaining = headers.get('anthropic-ratelimit-requests-remaining') \
+            or headers.get('x-ratelimit-remaining-requests')
+        retry_after = headers.get('retry-after')
+
+        try:
+            self._rate_limit.remaining = int(remaining) if remaining is not None else None
+        except ValueError:
+            self._rate_limit.remaining = None
+        try:
+            self._rate_limit.retry_after = float(retry_after) if retry_after else 0.0
+        except ValueError:
+            self._rate_limit.retry_after = 0.0
+
+    def _record_error(self, error: Exception):
+        """Capture rate-limit headers from a failed provider call, if any"""
+        response = getattr(error, 'response', None)
+        if response is not None:
+            self._record_rate_limit(response.headers)
+        else:
+            self._rate_limit.retry_after = 0.0
+
     def _chunk_text(self, text: str, max_chars: int = 100000) -> list:
         """
         Split text into chunks if it's too long
@@ -66,40 +158,69 @@ class Summarizer:
         if len(text) <= max_chars:
             return [text]
 
+        # Slice the original string at the last whitespace before each boundary
+        # instead of splitting it into words and joining them back together
         chunks = []
-        words = text.split()
-        current_chunk = []
-        current_length = 0
-
-        for word in words:
-            word_length = len(word) + 1  # +1 for space
-            if current_length + word_length > max_chars:
-                chunks.append(' '.join(current_chunk))
-                current_chunk = [word]
-                current_length = word_length
-            else:
-                current_chunk.append(word)
-                current_length += word_length
+        start = 0
+        length = len(text)
+
+        while start < length:
+            end = min(start + max_chars, length)
+            if end < length:
+                cut = max(text.rfind(' ', start, end), text.rfind('\n', start, end))
+                if cut > start:
+                    end = cut
 
-        if current_chunk:
-            chunks.append(' '.join(current_chunk))
+            chunk = text[start:end].strip()
+            if chunk:
+                chunks.append(chunk)
+            start = end + 1 if end < length and text[end].isspace() else end
 
         return chunks
 
-    def _summarize_with_claude(self, text: str, prompt: str) -> Tuple[bool, str, str]:
+    def _summarize_with_claude(self, text: str, prompt: str,
+                               max_tokens: int = MAX_OUTPUT_TOKENS) -> Tuple[bool, str, str]:
         """
         Summarize text using Claude
 
         Args:
             text: Text to summarize
             prompt: User's prompt for summarization
+            max_tokens: Most tokens the response may use
 
         Returns:
             Tuple of (success: bool, summary: str, error_message: str)
         """
         try:
-            # Construct the full prompt
-            full_prompt = f"""{prompt}
+            if self.enable_prompt_cache:
+                # Keep the prompt in a cached system block so only the document varies
+                raw = self.client.messages.with_raw_response.create(
+                    model=self.model,
+                    max_tokens=max_tokens,
+                    temperature=0.3,
+                    system=[
+                        {
+                            "type": "text",
+                            "text": prompt,
+                            "cache_control": {"type": "ephemeral"}
+                        }
+                    ],
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": f"""Here is the document to summarize:
+
+{text}
+
+Please provide the summary based on the instructions above."""
+                        }
+                    ]
+                )
+                message = raw.parse()
+                self._record_cache_read(getattr(message.usage, 'cache_read_input_tokens', 0) or 0)
+            else:
+                # Construct the full prompt
+                full_prompt = f"""{prompt}
 
 Here is the document to summarize:
 
@@ -107,32 +228,38 @@ Here is the document to summarize:
 
 Please provide the summary based on the instructions above."""
 
-            # Call Claude API
-            message = self.client.messages.create(
-                model=self.model,
-                max_tokens=4096,
-                temperature=0.3,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": full_prompt
-                    }
-                ]
-            )
+                # Call Claude API
+                raw = self.client.messages.with_raw_response.create(
+                    model=self.model,
+                    max_tokens=max_tokens,
+                    temperature=0.3,
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": full_prompt
+                        }
+                    ]
+                )
+                message = raw.parse()
 
+            self._record_rate_limit(raw.headers)
             summary = message.content[0].text
             return True, summary, ""
 
         except Exception as e:
+            self._record_error(e)
             return False, "", f"Claude API error: {str(e)}"
 
-    def _summarize_with_openai(self, text: str, prompt: str) -> Tuple[bool, str, str]:
+    def _summarize_with_openai(self, text: str, prompt: str, json_output: bool = False,
+                               max_tokens: int = MAX_OUTPUT_TOKENS) -> Tuple[bool, str, str]:
         """
         Summarize text using OpenAI
 
         Args:
             text: Text to summarize
             prompt: User's prompt for summarization
+            json_output: Ask the API to return a JSON object
+            max_tokens: Most tokens the response may use, capped at the model's limit
 
         Returns:
             Tuple of (success: bool, summary: str, error_message: str)
@@ -148,7 +275,7 @@ Here is the document to summarize:
 Please provide the summary based on the instructions above."""
 
             # Call OpenAI API
-            response = self.client.chat.completions.create(
+            raw = self.client.chat.completions.with_raw_response.create(
                 model=self.model,
                 messages=[
                     {
@@ -160,23 +287,29 @@ Please provide the summary based on the instructions above."""
                         "content": full_prompt
                     }
                 ],
-                max_tokens=4096,
-                temperature=0.3
+                max_tokens=min(max_tokens, MAX_OUTPUT_TOKENS),
+                temperature=0.3,
+                **({"response_format": {"type": "json_object"}} if json_output else {})
             )
 
+            self._record_rate_limit(raw.headers)
+            response = raw.parse()
             summary = response.choices[0].message.content
             return True, summary, ""
 
         except Exception as e:
+            self._record_error(e)
             return False, "", f"OpenAI API error: {str(e)}"
 
-    def _summarize_with_openrouter(self, text: str, prompt: str) -> Tuple[bool, str, str]:
+    def _summarize_with_openrouter(self, text: str, prompt: str,
+                                   max_tokens: int = MAX_OUTPUT_TOKENS) -> Tuple[bool, str, str]:
         """
         Summarize text using OpenRouter (Grok)
 
         Args:
             text: Text to summarize
             prompt: User's prompt for summarization
+            max_tokens: Most tokens the response may use
 
         Returns:
             Tuple of (success: bool, summary: str, error_message: str)
@@ -192,7 +325,7 @@ Here is the document to summarize:
 Please provide the summary based on the instructions above."""
 
             # Call OpenRouter API
-            response = self.client.chat.completions.create(
+            raw = self.client.chat.completions.with_raw_response.create(
                 model=self.model,
                 messages=[
                     {
@@ -205,97 +338,291 @@ Please provide the summary based on the instructions above."""
                     }
                 ],
                 extra_body={"reasoning": {"enabled": True}},
-                max_tokens=4096,
+                max_tokens=max_tokens,
                 temperature=0.3
             )
 
+            self._record_rate_limit(raw.headers)
+            response = raw.parse()
             summary = response.choices[0].message.content
             return True, summary, ""
 
         except Exception as e:
+            self._record_error(e)
             return False, "", f"OpenRouter API error: {str(e)}"
 
-    def summarize(self, text: str, prompt: str) -> Tuple[bool, str, str]:
+    def _summarize_with_provider(self, text: str, prompt: str, json_output: bool = False,
+                                 rate_limiter=None, max_tokens: int = MAX_OUTPUT_TOKENS) -> Tuple[bool, str, str]:
+        """
+        Summarize text with the configured provider, without chunking
+
+        Every provider request goes through here, so each one draws a token
+        from the rate limiter and reports the provider's rate-limit headers back.
+
+        Args:
+            text: Text to summarize
+            prompt: User's prompt for summarization
+            json_output: Ask for a JSON object where the provider supports it
+            rate_limiter: Optional TokenBucket shared by all workers
+            max_tokens: Most tokens the response may use
+
+        Returns:
+            Tuple of (success: bool, summary: str, error_message: str)
+        """
+        if rate_limiter:
+            rate_limiter.acquire()
+
+        if self.provider == 'claude':
+            result = self._summarize_with_claude(text, prompt, max_tokens)
+        elif self.provider == 'openrouter':
+            result = self._summarize_with_openrouter(text, prompt, max_tokens)
+        else:
+            result = self._summarize_with_openai(text, prompt, json_output, max_tokens)
+
+        if rate_limiter:
+            # Let the provider's rate-limit headers steer the shared bucket
+            if not result[0] and self.retry_after:
+                rate_limiter.penalize(self.retry_after)
+            else:
+                rate_limiter.observe_remaining(self.requests_remaining)
+
+        return result
+
+    def _summarize_many(self, requests: list, max_workers: int, rate_limiter=None) -> list:
+        """
+        Run several provider calls in parallel
+
+        The rate-limit headers and cached tokens seen by the worker threads are
+        folded back into the calling thread, so requests_remaining, retry_after
+        and thread_cache_read_tokens stay accurate.
+
+        Args:
+            requests: List of (text, prompt) pairs
+            max_workers: Number of calls in flight at once
+            rate_limiter: Optional TokenBucket shared by all workers
+
+        Returns:
+            List of (success, summary, error_message) tuples in request order
+        """
+        def summarize_one(request):
+            text, prompt = request
+            cached_before = self.thread_cache_read_tokens
+            result = self._summarize_with_provider(text, prompt, rate_limiter=rate_limiter)
+            return result, self.requests_remaining, self.retry_after, self.thread_cache_read_tokens - cached_before
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(requests)))) as pool:
+            outcomes = list(pool.map(summarize_one, requests))
+
+        reported = [remaining for _, remaining, _, _ in outcomes if remaining is not None]
+        self._rate_limit.remaining = min(reported) if reported else None
+        self._rate_limit.retry_after = max(retry_after for _, _, retry_after, _ in outcomes)
+        self._rate_limit.cache_read_tokens = self.thread_cache_read_tokens + sum(cached for *_, cached in outcomes)
+
+        return [result for result, _, _, _ in outcomes]
+
+    def _summarize_chunks(self, chunks: list, prompt: str, max_workers: int, rate_limiter=None) -> list:
+        """
+        Summarize the chunks of one document in parallel
+
+        Args:
+            chunks: Text chunks, in document order
+            prompt: User's prompt for summarization
+            max_workers: Number of chunks summarized at once
+            rate_limiter: Optional TokenBucket shared by all workers
+
+        Returns:
+            List of (success, summary, error_message) tuples in chunk order
+        """
+        return self._summarize_many([
+            (chunk, f"{prompt}\n\n(This is part {i} of {len(chunks)} of the document)")
+            for i, chunk in enumerate(chunks, 1)
+        ], max_workers, rate_limiter)
+
+    def _reduce_summaries(self, summaries: list, prompt: str, rate_limiter=None) -> Tuple[bool, str, str]:
+        """
+        Merge partial summaries pairwise until one is left
+
+        Each call only sees two partial summaries, so the prompt size stays
+        bounded however many chunks the document had. The merges of one level
+        run in parallel.
+
+        Args:
+            summaries: Partial summaries, in document order
+            prompt: User's prompt for summarization
+            rate_limiter: Optional TokenBucket shared by all workers
+
+        Returns:
+            Tuple of (success: bool, summary: str, error_message: str)
+        """
+        merge_prompt = f"{prompt}\n\nPlease merge these two consecutive partial summaries into one consolidated summary:"
+
+        while len(summaries) > 1:
+            pairs = [(summaries[i], summaries[i + 1]) for i in range(0, len(summaries) - 1, 2)]
+            results = self._summarize_many(
+                [(f"{first}\n\n{second}", merge_prompt) for first, second in pairs],
+                MAX_CONCURRENT_CHUNKS, rate_limiter
+            )
+
+            merged = []
+            for success, summary, error in results:
+                if not success:
+                    return False, "", f"Error merging summaries: {error}"
+                merged.append(summary)
+
+            # An odd summary out moves up to the next level unchanged
+            if len(summaries) % 2:
+                merged.append(summaries[-1])
+            summaries = merged
+
+        return True, summaries[0], ""
+
+    def summarize(self, text: str, prompt: str, rate_limiter=None) -> Tuple[bool, str, str]:
         """
         Summarize text using the configured provider
 
         Args:
             text: Text to summarize
             prompt: User's prompt for summarization
+            rate_limiter: Optional TokenBucket; every provider request draws a token
 
         Returns:
             Tuple of (success: bool, summary: str, error_message: str)
         """
         # Handle very long texts by chunking
-        chunks = self._chunk_text(text, max_chars=100000)
+        chunks = self._chunk_text(text, max_chars=CHUNK_MAX_CHARS)
 
         if len(chunks) == 1:
             # Single chunk, process normally
-            if self.provider == 'claude':
-                return self._summarize_with_claude(text, prompt)
-            elif self.provider == 'openrouter':
-                return self._summarize_with_openrouter(text, prompt)
-            else:
-                return self._summarize_with_openai(text, prompt)
+            return self._summarize_with_provider(text, prompt, rate_limiter=rate_limiter)
         else:
-            # Multiple chunks - summarize each and combine
+            # Multiple chunks - summarize them concurrently and combine
             summaries = []
+            results = self._summarize_chunks(chunks, prompt, MAX_CONCURRENT_CHUNKS, rate_limiter)
 
-            for i, chunk in enumerate(chunks, 1):
-                chunk_prompt = f"{prompt}\n\n(This is part {i} of {len(chunks)} of the document)"
-
-                if self.provider == 'claude':
-                    success, summary, error = self._summarize_with_claude(chunk, chunk_prompt)
-                elif self.provider == 'openrouter':
-                    success, summary, error = self._summarize_with_openrouter(chunk, chunk_prompt)
-                else:
-                    success, summary, error = self._summarize_with_openai(chunk, chunk_prompt)
-
+            for i, (success, summary, error) in enumerate(results, 1):
                 if not success:
                     return False, "", f"Error in chunk {i}: {error}"
 
                 summaries.append(f"[Part {i}]\n{summary}")
 
+            # If there are many chunks, merge the part summaries pairwise
+            if len(chunks) > 3:
+                return self._reduce_summaries(summaries, prompt, rate_limiter)
+
             # Combine all chunk summaries
-            combined_summary = "\n\n".join(summaries)
+            return True, "\n\n".join(summaries), ""
 
-            # If there are many chunks, create a final summary of summaries
-            if len(chunks) > 3:
-                final_prompt = f"{prompt}\n\nPlease create a final consolidated summary from these partial summaries:"
+    def summarize_long(self, text: str, long_prompt: str, short_prompt: str,
+                       chunk_chars: int = 16000, max_workers: int = 6,
+                       rate_limiter=None) -> Tuple[bool, str, str, str]:
+        """
+        Create both summaries for a very long document with map-reduce
+
+        The document is split into ~4k-token sections that are summarized in
+        parallel; the combined section summaries then go through create_summaries.
+
+        Args:
+            text: Text to summarize
+            long_prompt: Prompt for long summary
+            short_prompt: Prompt for short summary
+            chunk_chars: Maximum characters per section (~4 characters per token)
+            max_workers: Number of sections summarized at once
+            rate_limiter: Optional TokenBucket; every provider request draws a token
+
+        Returns:
+            Tuple of (success: bool, long_summary: str, short_summary: str, error_message: str)
+        """
+        chunks = self._chunk_text(text, max_chars=chunk_chars)
+        results = self._summarize_chunks(chunks, long_prompt, max_workers, rate_limiter)
+
+        summaries = []
+        for i, (success, summary, error) in enumerate(results, 1):
+            if not success:
+                return False, "", "", f"Long summary error: Error in chunk {i}: {error}"
+            summaries.append(f"[Part {i}]\n{summary}")
+
+        return self.create_summaries("\n\n".join(summaries), long_prompt, short_prompt, rate_limiter)
+
+    @staticmethod
+    def _parse_summaries(response: Optional[str]) -> Optional[Tuple[str, str]]:
+        """
+        Read the long and short summary out of a JSON response
+
+        Args:
+            response: Model output, possibly wrapped in a code fence; OpenAI-compatible
+                APIs can return None content
 
-                if self.provider == 'claude':
-                    return self._summarize_with_claude(combined_summary, final_prompt)
-                elif self.provider == 'openrouter':
-                    return self._summarize_with_openrouter(combined_summary, final_prompt)
-                else:
-                    return self._summarize_with_openai(combined_summary, final_prompt)
+        Returns:
+            (long_summary, short_summary), or None if the response isn't usable
+        """
+        if not response:
+            return None
 
-            return True, combined_summary, ""
+        start, end = response.find('{'), response.rfind('}')
+        if start == -1 or end < start:
+            return None
 
-    def create_summaries(self, text: str, long_prompt: str, short_prompt: str) -> Tuple[bool, str, str, str]:
+        try:
+            # Models often put raw newlines inside the summary strings
+            data = json.loads(response[start:end + 1], strict=False)
+        except ValueError:
+            return None
+
+        if not isinstance(data, dict):
+            return None
+        long_summary, short_summary = data.get('long_summary'), data.get('short_summary')
+        if not isinstance(long_summary, str) or not isinstance(short_summary, str):
+            return None
+        if not long_summary.strip() or not short_summary.strip():
+            return None
+
+        return long_summary.strip(), short_summary.strip()
+
+    def create_summaries(self, text: str, long_prompt: str, short_prompt: str,
+                         rate_limiter=None) -> Tuple[bool, str, str, str]:
         """
         Create both long and short summaries
 
+        Text that fits in one request gets both summaries from a single call;
+        longer text, or a response that isn't valid JSON, uses a long-summary
+        call followed by a short summary of the long one.
+
         Args:
             text: Text to summarize
             long_prompt: Prompt for long summary
             short_prompt: Prompt for short summary
+            rate_limiter: Optional TokenBucket; every provider request draws a token
 
         Returns:
             Tuple of (success: bool, long_summary: str, short_summary: str, error_message: str)
         """
+        if len(text) <= CHUNK_MAX_CHARS:
+            combined_prompt = COMBINED_PROMPT_TEMPLATE.format(long_prompt=long_prompt, short_prompt=short_prompt)
+            success, response, error = self._summarize_with_provider(
+                text, combined_prompt, json_output=True, rate_limiter=rate_limiter,
+                max_tokens=COMBINED_MAX_OUTPUT_TOKENS
+            )
+            if not success:
+                return False, "", "", f"Long summary error: {error}"
+
+            parsed = self._parse_summaries(response)
+            if parsed:
+                return True, parsed[0], parsed[1], ""
+
         # Generate long summary
-        success, long_summary, error = self.summarize(text, long_prompt)
+        success, long_summary, error = self.summarize(text, long_prompt, rate_limiter)
         if not success:
             return False, "", "", f"Long summary error: {error}"
 
-        # Wait a bit to respect rate limits
-        time.sleep(2)
+        # Only back off when the provider says the window is nearly used up
+        remaining = self.requests_remaining
+        if remaining is not None and remaining <= LOW_REMAINING_REQUESTS:
+            time.sleep(LOW_REMAINING_PAUSE)
 
         # Generate short summary using the long summary as context
         # This significantly reduces token usage as we don't send the full text again
         short_summary_context = f"Here is a detailed summary of a document. Please generate a very concise short summary based on this:\n\n{long_summary}"
-        success, short_summary, error = self.summarize(short_summary_context, short_prompt)
+        success, short_summary, error = self.summarize(short_summary_context, short_prompt, rate_limiter)
         
         if not success:
             # If short summary fails, we still return the long summary